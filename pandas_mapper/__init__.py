@@ -3,3 +3,5 @@ import logging
 LOG = logging.getLogger('pandas-mapper')
 
 import pandas_mapper.pandas_mapper
+import pandas_mapper.coercions
+import pandas_mapper.cache
@@ -0,0 +1,133 @@
+import pickle
+import sqlite3
+
+from contextlib import closing
+
+# Keys are looked up in batches, to stay under the SQLite limit on query parameters
+_BATCH_SIZE = 500
+
+class TransformCache:
+    def __init__(self, path, max_entries=None, cache_errors=False):
+        '''
+        A persistent cache of transform results, stored in a SQLite database file, so that
+        the results of expensive transforms can be reused from one run to the next.
+
+        Used as the ``cache`` of a ``PdMap``, the distinct source values of a mapping are
+        looked up in the cache all at once, the transform is only evaluated for the values
+        that are not in it, and their results are written back all at once.  Results are
+        keyed by the identity of the transform (see the ``cache_key`` of ``PdMap``) and the
+        source values, which (like the results) must be picklable.
+
+        A cache can be shared by several maps, mappers and processes.  It does not keep a
+        connection open, so it can be pickled along with the maps.
+
+        Args:
+          path (str): The path of the SQLite database file, which is created if needed.
+          max_entries (int): If set, the least recently used results are evicted once the
+                             cache holds more than ``max_entries`` results.
+          cache_errors (boolean): If True, the exceptions raised by the transform are also
+                                  cached, and replayed as mapping errors instead of calling
+                                  the transform again.
+        '''
+
+        self.path = path
+        self.max_entries = max_entries
+        self.cache_errors = cache_errors
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'namespace TEXT NOT NULL, key BLOB NOT NULL, value BLOB, failed INTEGER NOT NULL, '
+                'used INTEGER NOT NULL, PRIMARY KEY (namespace, key))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60)
+
+    @staticmethod
+    def _next_use(conn):
+        # Uses are counted rather than timed, so that their order never depends on the clock
+        return conn.execute('SELECT COALESCE(MAX(used), 0) + 1 FROM results').fetchone()[0]
+
+    def __len__(self):
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __repr__(self):
+        return 'TransformCache({!r})'.format(self.path)
+
+    def clear(self, namespace=None):
+        '''Removes all of the cached results (or only those of one transform ``namespace``).'''
+        with closing(self._connect()) as conn, conn:
+            if namespace is None:
+                conn.execute('DELETE FROM results')
+            else:
+                conn.execute('DELETE FROM results WHERE namespace = ?', (namespace,))
+
+    def get_many(self, namespace, keys):
+        '''
+        Looks up the results of several (pickled) source values at once.
+
+        Returns:
+          dict: The ``(result, failed)`` pairs of the keys that are cached, where ``result``
+                is the exception raised by the transform if ``failed`` is True.  Failures
+                are only returned when ``cache_errors=True``.
+        '''
+
+        found = {}
+        with closing(self._connect()) as conn, conn:
+            for start in range(0, len(keys), _BATCH_SIZE):
+                batch = keys[start:start + _BATCH_SIZE]
+                rows = conn.execute(
+                    'SELECT key, value, failed FROM results WHERE namespace = ? AND key IN ({})'.format(
+                        ', '.join('?' * len(batch))
+                    ),
+                    [namespace] + batch
+                ).fetchall()
+
+                for key, value, failed in rows:
+                    if failed and not self.cache_errors:
+                        continue
+                    try:
+                        found[key] = (pickle.loads(value), bool(failed))
+                    except Exception:
+                        # Results that can no longer be unpickled are recomputed
+                        continue
+
+            if found:
+                used = self._next_use(conn)
+                conn.executemany(
+                    'UPDATE results SET used = ? WHERE namespace = ? AND key = ?',
+                    [(used, namespace, key) for key in found]
+                )
+        return found
+
+    def set_many(self, namespace, items):
+        '''
+        Stores the results of several (pickled) source values at once, given as
+        ``(key, result, failed)`` triples.  Results that cannot be pickled are not cached,
+        and neither are failures unless ``cache_errors=True``.
+        '''
+
+        rows = []
+        for key, result, failed in items:
+            if failed and not self.cache_errors:
+                continue
+            try:
+                rows.append((namespace, key, pickle.dumps(result), int(failed)))
+            except Exception:
+                continue
+
+        with closing(self._connect()) as conn, conn:
+            used = self._next_use(conn)
+            rows = [row + (used,) for row in rows]
+            conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)', rows)
+            if self.max_entries is not None:
+                excess = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        'DELETE FROM results WHERE rowid IN '
+                        '(SELECT rowid FROM results ORDER BY used LIMIT ?)',
+                        (excess,)
+                    )
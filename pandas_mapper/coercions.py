@@ -0,0 +1,225 @@
+import decimal
+import re
+
+import numpy as np
+import pandas as pd
+
+# Characters that Python number literals accept, but pd.to_numeric does not
+_PYTHON_ONLY_CHARACTERS = re.compile(r'[^\x00-\x7f]|_')
+
+class Coercion:
+    def __init__(self, convert, description):
+        '''
+        A vectorized one-to-one transform that converts a column to another type.
+
+        Used as the transform of a ``PdMap``, the whole source column is converted at once,
+        and the rows that were not null before the conversion but are null after it (i.e.,
+        that could not be converted) are mapping errors, handled according to ``on_error``.
+
+        Args:
+          convert (func): Converts a ``pd.Series``, returning null for the values that
+                          cannot be converted.
+          description (str): What the values are converted to, used in error messages
+                             (e.g., 'a number').
+        '''
+
+        self.convert = convert
+        self.description = description
+
+    def __call__(self, values):
+        return self.convert(values)
+
+    def error(self, value):
+        '''Returns the exception for a value that cannot be converted.'''
+        return ValueError('cannot convert {!r} to {}'.format(value, self.description))
+
+    def __repr__(self):
+        return 'Coercion(to {})'.format(self.description)
+
+
+def _parse_numbers(values):
+    '''
+    Parses a column into numbers like ``pd.to_numeric(errors='coerce')``, but first tries the
+    much faster parsing of ``astype`` for columns of strings that are all valid.
+    '''
+
+    if pd.api.types.infer_dtype(values, skipna=False) == 'string':
+        # Unlike pd.to_numeric, astype also accepts the underscores and non-ASCII digits of
+        # Python literals, so it is only used for strings without them
+        if _PYTHON_ONLY_CHARACTERS.search(''.join(values)) is None:
+            for dtype in ('int64', 'float64'):
+                try:
+                    return values.astype(dtype)
+                except (TypeError, ValueError, OverflowError):
+                    pass
+    return pd.to_numeric(values, errors='coerce')
+
+def _exact_integer(value):
+    '''Returns the integer written in a string (or given as a number), or None if it is not one.'''
+    try:
+        number = decimal.Decimal(value.strip() if isinstance(value, str) else value)
+    except (decimal.InvalidOperation, TypeError, ValueError):
+        return None
+    return int(number) if number.is_finite() and number == number.to_integral_value() else None
+
+def _exact_integers(values, numbers):
+    '''
+    Returns the integer values (or None) of a column, given the numbers parsed from it when
+    they are not all integers.  Floats parsed from text may have been rounded to an integer,
+    so the text of those values is checked (and converted) exactly instead.
+    '''
+
+    floats = numbers.astype(float)
+    integral = (floats % 1 == 0).to_numpy()
+
+    integers = np.full(len(values), None, dtype=object)
+    if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+        text = values[integral].astype(object)
+        try:
+            # Usually, the text is all integers, which astype parses exactly
+            integers[integral] = text.astype('int64').to_numpy(dtype=object)
+        except (TypeError, ValueError, OverflowError):
+            integers[integral] = [_exact_integer(value) for value in text]
+    else:
+        integers[integral] = [int(number) for number in floats[integral]]
+    return pd.Series(integers, index=values.index)
+
+def to_numeric(downcast=None):
+    '''
+    Converts values to numbers (see ``pd.to_numeric``).
+
+    Args:
+      downcast (str): 'integer', 'signed', 'unsigned' or 'float' to use the smallest
+                      dtype that can hold the values.
+    '''
+
+    def convert(values):
+        numbers = _parse_numbers(values)
+        return numbers if downcast is None else pd.to_numeric(numbers, downcast=downcast)
+
+    return Coercion(convert, 'a number')
+
+def to_integer(dtype='Int64'):
+    '''
+    Converts values to integers.  Numbers with a fractional part, and integers that do not
+    fit in ``dtype``, cannot be converted.
+
+    Args:
+      dtype (str): The nullable integer dtype of the result (e.g., 'Int64' or 'UInt8').
+    '''
+
+    pandas_dtype = pd.api.types.pandas_dtype(dtype)
+    # The values that cannot be converted are missing, which numpy integers cannot hold
+    nullable = isinstance(pandas_dtype, pd.api.extensions.ExtensionDtype)
+    if not nullable or not pd.api.types.is_integer_dtype(pandas_dtype):
+        raise ValueError('dtype {} is not a nullable integer dtype (e.g., "Int64")'.format(pandas_dtype))
+    limits = np.iinfo(getattr(pandas_dtype, 'numpy_dtype', pandas_dtype))
+
+    def convert(values):
+        if pd.api.types.is_integer_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+            integers = values
+        else:
+            integers = _parse_numbers(values)
+            if not pd.api.types.is_integer_dtype(integers.dtype):
+                integers = _exact_integers(values, integers)
+
+        if integers.dtype == object:
+            try:
+                return integers.astype(dtype)
+            except (TypeError, ValueError, OverflowError):
+                in_range = np.array(
+                    [value is not None and limits.min <= value <= limits.max for value in integers],
+                    dtype=bool
+                )
+        else:
+            in_range = ((integers >= limits.min) & (integers <= limits.max)).to_numpy(dtype=bool, na_value=False)
+
+        # Masking a numpy integer column would convert it to float, losing precision
+        if not in_range.all():
+            integers = integers.astype(object).where(in_range)
+        return integers.astype(dtype)
+
+    return Coercion(convert, 'an integer')
+
+def to_datetime(format=None, utc=False):
+    '''
+    Converts values to datetimes (see ``pd.to_datetime``).
+
+    Args:
+      format (str): The strftime format of the values (e.g., '%Y-%m-%d').  Values that do
+                    not match it cannot be converted.
+      utc (boolean): If True, return timezone-aware UTC datetimes.
+    '''
+
+    return Coercion(
+        lambda values: pd.to_datetime(values, format=format, utc=utc, errors='coerce'),
+        'a datetime' if format is None else 'a datetime with format {!r}'.format(format)
+    )
+
+def to_boolean(true_values=('true', 't', 'yes', 'y', '1'), false_values=('false', 'f', 'no', 'n', '0')):
+    '''
+    Converts values to booleans, by comparing their (trimmed, lowercase) text to
+    ``true_values`` and ``false_values``.
+
+    Args:
+      true_values (iterable): The text of the values that are True.
+      false_values (iterable): The text of the values that are False.
+    '''
+
+    lookup = {**{value: False for value in false_values}, **{value: True for value in true_values}}
+
+    def convert(values):
+        text = values.astype('string').str.strip().str.lower()
+        return text.map(lookup).astype('boolean')
+
+    return Coercion(convert, 'a boolean')
+
+def to_decimal(places=None):
+    '''
+    Converts values to ``decimal.Decimal``s, so that they are represented exactly.
+
+    Args:
+      places (int): If given, round the values to this many decimal places.
+    '''
+
+    exponent = None if places is None else decimal.Decimal(1).scaleb(-places)
+    pattern = r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?'
+
+    def parse(value):
+        try:
+            return decimal.Decimal(value) if exponent is None else decimal.Decimal(value).quantize(exponent)
+        except decimal.InvalidOperation:
+            # The value has too many digits to be rounded to the given places
+            return None
+
+    def convert(values):
+        text = values.astype('string').str.strip()
+        valid = text.str.fullmatch(pattern).fillna(False).to_numpy(dtype=bool)
+
+        converted = np.full(len(values), None, dtype=object)
+        converted[valid] = [parse(value) for value in text[valid]]
+        return pd.Series(converted, index=values.index)
+
+    return Coercion(convert, 'a decimal')
+
+def to_string(strip=True, case=None):
+    '''
+    Converts values to (nullable) strings.
+
+    Args:
+      strip (boolean): If True (default), remove leading and trailing whitespace.
+      case (str): 'lower', 'upper' or 'title' to change the case of the strings.
+    '''
+
+    if case not in (None, 'lower', 'upper', 'title'):
+        raise ValueError('unknown case supplied: {}'.format(case))
+
+    def convert(values):
+        text = values.astype('string')
+        if strip:
+            text = text.str.strip()
+        if case is not None:
+            text = getattr(text.str, case)()
+        return text
+
+    return Coercion(convert, 'a string')
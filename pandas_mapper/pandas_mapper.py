@@ -1,15 +1,230 @@
+import asyncio
+import inspect
+import itertools
 import logging
+import os
+import pickle
+import re
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
 import pandas_mapper
 from pandas_mapper import LOG
+from pandas_mapper.coercions import Coercion
 
 class MissingSourceFieldError(Exception): pass
-class PdMappingError(Exception): pass
+class _ErrorLimitExceeded(Exception): pass
+
+# Marks options that were not given (e.g., a lookup without a default)
+_UNSET = object()
+
+class PdMappingError(Exception):
+    def __init__(self, message, mapper=None):
+        '''
+        Raised when mapping errors are encountered and are not redirected.
+
+        Args:
+          message (str): Description of the failure.
+          mapper (PdMapper): The mapper that raised the error, which gives access to the
+                             errors collected before the error was raised.
+        '''
+        super().__init__(message)
+        self.mapper = mapper
+
+def _message_template(message):
+    '''Replaces the quoted strings and numbers in an error message with placeholders.'''
+    message = re.sub(r"'[^']*'|\"[^\"]*\"", "'...'", message)
+    return re.sub(r'\d+(\.\d+)?', '#', message)
+
+def _error_message(err_type, arg, err):
+    return '{}({}): {}'.format(err_type, arg, err)
+
+def _copy_on_write():
+    '''Returns True if pandas copy-on-write is enabled, which it always is from pandas 3.'''
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except KeyError:
+        # The option only exists from pandas 1.5 (OptionError is a KeyError)
+        return False
+
+class PdMapErrors:
+    '''
+    Columnar record of the rows that a map failed to transform.
+
+    Errors are stored as the positions of the failing rows in the dataframe the map was
+    evaluated on, along with the exception raised for each row.  The arguments that were
+    passed to the transform are not stored, since they can be recovered from the source
+    dataframe if they are needed.
+
+    Args:
+      limit (int): If set, recording more than ``limit`` errors stops the map from being
+                   evaluated any further.
+    '''
+
+    def __init__(self, limit=None):
+        self.limit = limit
+        self._count = 0
+        # The number of errors of all of the stores that share the limit (see ``_share_limit``)
+        self._shared_count = [0]
+        self._positions = np.empty(0, dtype=np.int64)
+        self._exceptions = np.empty(0, dtype=object)
+        self._blocks = []
+        self._row_positions = []
+        self._row_exceptions = []
+
+    def __len__(self):
+        return self._count
+
+    def _check_limit(self):
+        if self.limit is not None and self._shared_count[0] > self.limit:
+            raise _ErrorLimitExceeded()
+
+    @staticmethod
+    def _share_limit(errors_list, limit):
+        '''Makes several (empty) stores stop once more than ``limit`` errors are recorded by all of them.'''
+        shared_count = [0]
+        for errors in errors_list:
+            errors.limit = limit
+            errors._shared_count = shared_count
+
+    def append(self, position, exception):
+        '''Records an error for the row at ``position``.'''
+        self._row_positions.append(position)
+        self._row_exceptions.append(exception)
+        self._count += 1
+        self._shared_count[0] += 1
+        self._check_limit()
+
+    def extend(self, positions, exceptions):
+        '''
+        Records errors for the rows at ``positions``.  ``exceptions`` is either a single
+        exception that applies to all of the rows, or a sequence with one exception per row.
+        '''
+        block_exceptions = np.empty(len(positions), dtype=object)
+        if isinstance(exceptions, BaseException):
+            block_exceptions.fill(exceptions)
+        else:
+            block_exceptions[:] = exceptions
+        self._blocks.append((np.asarray(positions, dtype=np.int64), block_exceptions))
+        self._count += len(positions)
+        self._shared_count[0] += len(positions)
+        self._check_limit()
+
+    @classmethod
+    def concat(cls, errors_list, offsets):
+        '''Combines errors recorded on consecutive slices that start at ``offsets``.'''
+        combined = cls()
+        for errors, offset in zip(errors_list, offsets):
+            combined.extend(errors.positions + offset, errors.exceptions)
+        return combined
+
+    def _consolidate(self):
+        if len(self._row_positions) > 0:
+            block_exceptions = np.empty(len(self._row_exceptions), dtype=object)
+            block_exceptions[:] = self._row_exceptions
+            self._blocks.append((np.asarray(self._row_positions, dtype=np.int64), block_exceptions))
+            self._row_positions = []
+            self._row_exceptions = []
+
+        if len(self._blocks) > 0:
+            positions = np.concatenate([self._positions] + [block[0] for block in self._blocks])
+            exceptions = np.concatenate([self._exceptions] + [block[1] for block in self._blocks])
+            order = np.argsort(positions, kind='stable')
+            self._positions = positions[order]
+            self._exceptions = exceptions[order]
+            self._blocks = []
+
+    @property
+    def positions(self):
+        '''Positions of the failing rows, in row order.'''
+        self._consolidate()
+        return self._positions
+
+    @property
+    def exceptions(self):
+        '''The exception raised for each failing row.'''
+        self._consolidate()
+        return self._exceptions
+
+    def _per_exception(self, func):
+        # Rows that failed in the same batch share an exception, so only evaluate once each
+        results = {}
+        return np.array(
+            [
+                results[id(err)] if id(err) in results else results.setdefault(id(err), func(err))
+                for err in self.exceptions
+            ],
+            dtype=object
+        )
+
+    @property
+    def types(self):
+        '''The class name of the exception raised for each failing row.'''
+        return self._per_exception(lambda err: err.__class__.__name__)
+
+    @property
+    def messages(self):
+        '''The message of the exception raised for each failing row.'''
+        return self._per_exception(str)
+
+    @property
+    def templates(self):
+        '''The message of each exception, with any quoted strings and numbers masked.'''
+        return self._per_exception(lambda err: _message_template(str(err)))
+
+class _ForwardedErrors(PdMapErrors):
+    '''
+    Records the errors of a subset of the rows (e.g., the distinct values of a memoized map),
+    and forwards each of them right away to ``errors``, for every row it stands for, so that
+    the error limit of ``errors`` is enforced as soon as it is crossed.
+
+    Args:
+      errors (PdMapErrors): The errors of all of the rows.
+      positions (array): The positions in ``errors`` of the rows of the subset.
+      codes (array): Alternatively, the position in the subset that each row stands for.
+    '''
+
+    def __init__(self, errors, positions=None, codes=None):
+        super().__init__()
+        self._errors = errors
+        self._subset_positions = positions
+        if codes is not None:
+            self._order = np.argsort(codes, kind='stable')
+            self._sorted_codes = codes[self._order]
+
+    def _rows(self, position):
+        start, stop = np.searchsorted(self._sorted_codes, [position, position + 1])
+        return self._order[start:stop]
+
+    def append(self, position, exception):
+        super().append(position, exception)
+        if self._subset_positions is not None:
+            self._errors.append(self._subset_positions[position], exception)
+        else:
+            self._errors.extend(self._rows(position), exception)
+
+    def extend(self, positions, exceptions):
+        super().extend(positions, exceptions)
+        positions = np.asarray(positions, dtype=np.int64)
+        if self._subset_positions is not None:
+            self._errors.extend(self._subset_positions[positions], exceptions)
+        elif isinstance(exceptions, BaseException):
+            for position in positions:
+                self._errors.extend(self._rows(position), exceptions)
+        else:
+            for position, exception in zip(positions, exceptions):
+                self._errors.extend(self._rows(position), exception)
 
 class PdMap:
-    def __init__(self, source=None, target=None, transform=None):
+    def __init__(self, source=None, target=None, transform=None, vectorized=False, bisect=False,
+                 memoize=False, max_concurrency=64, row_type='series', dtype=None, default=_UNSET,
+                 check_finite=False, when=None, otherwise=_UNSET, na_action=None, na_how='any',
+                 categorical=False, cache=None, cache_key=None):
         '''Defines how a set of Pandas dataframe columns are to be mapped.
 
         The expected arguments and return values of the transform
@@ -25,15 +240,128 @@ class PdMap:
             a single value.  However, if the mapping has multiple targets, then the return
             value should be the same dict-like object that was passed to the function, with
             the target-column keys of that object have been modified in place by the function.
+            Alternatively, it may return a tuple of the target values, in the order of the
+            targets.
           * If the mapping has no source columns, then the transform can either be a constant
             (e.g., the integer 5), or a function that accepts no arguments but returns a value
             (which may be useful if you want to use a random number generator).
+          * If the transform is a lookup table (a dict, ``pd.Series`` or ``pd.DataFrame``),
+            then the values of the source columns are looked up in it (see below).
+          * If the transform is a ``Coercion`` (see ``pandas_mapper.coercions``), then the
+            single source column is converted to another type all at once, and the values
+            that cannot be converted are mapping errors.
+          * If the mapping has source columns and the transform is a string, then it is an
+            expression over the source columns (e.g., ``'price * qty - discount'``), which
+            is evaluated for all rows at once with ``DataFrame.eval``.
+
+        A lookup table maps keys to values: the keys of a dict or the index of a series or
+        dataframe.  With multiple source columns, the keys are tuples (or a ``MultiIndex``)
+        of the source values, in the order of the sources.  A dataframe provides the values
+        of each target from the column of the same name (or from its only column, if there
+        is a single target).  The lookup is done as a vectorized hash join rather than a call
+        per row.  Rows whose keys are not in the table are mapping errors, unless a
+        ``default`` value is given for them.
+
+        When ``vectorized=True``, the transform is called once for all rows instead of once
+        per row.  A one-to-one transform receives the source column as a ``pd.Series`` and
+        should return a Series indexed like the source column (or an array-like of the same
+        length).  Any other transform receives a dataframe containing the source columns and
+        should return a Series (single target) or a dataframe containing the target columns
+        (multiple targets), indexed like the sources.  If a vectorized transform raises an
+        exception (or returns a result that is not indexed like its input), every row it was
+        given is treated as a mapping error, unless ``bisect=True``, in which case the rows
+        are split in half and each half is retried until the failing rows have been isolated.
+
+        When ``memoize=True``, the transform is only evaluated once for each distinct value
+        (or distinct combination of values) of the source columns, and the results are
+        broadcast back to every row carrying that value (values are distinct if they differ
+        or have different types, so ``1``, ``1.0`` and ``True`` are each transformed, but
+        ``0.0`` and ``-0.0`` share a result).  If the transform fails for a distinct value,
+        every row with that value is treated as a mapping error.  The transform
+        must be a pure function of its sources and the source values must be hashable.
+
+        The transform may also be a coroutine function (``async def``), which is useful for
+        I/O-bound transforms like lookups against a service or database.  The rows are then
+        transformed concurrently in an asyncio event loop, with at most ``max_concurrency``
+        transforms awaiting at any time.  Coroutine transforms are always called row-wise.
+
+        By default, the rows passed to a transform of multiple source columns are
+        ``pd.Series``, which are slow to build for every row.  With ``row_type='dict'``, each
+        row is instead a plain dict of the source values, and with ``row_type='namedtuple'``
+        it is a namedtuple (as from ``DataFrame.itertuples``), whose fields are the source
+        columns (renamed to ``_0``, ``_1``, etc. if they are not valid identifiers).  Unlike a
+        Series, these rows do not carry the row label.
+
+        When a ``when`` condition is given, the transform is only applied to the rows that
+        match it, and the ``otherwise`` transform (which can be anything ``transform`` can,
+        or a constant) is applied to the rest.  The condition is an expression over the
+        source columns, or a vectorized function of them (like a vectorized transform) that
+        returns a boolean mask, indexed like its input if it is a Series.  Each branch is evaluated on its own subset of the rows, so an
+        expensive transform only runs where it is needed, and the results are stitched back
+        together in row order.  If ``otherwise`` is not given, the rows that do not match
+        the condition are mapping errors.
+
+        When ``dtype`` is given, the mapped values are converted to that dtype in one pass
+        instead of having their type inferred, so that (e.g.) integer results are not left as
+        objects.  Rows with mapping errors are masked (as missing, or zero for dtypes without
+        a missing value, since they are dropped from the output anyway), and rows whose
+        values cannot be converted become mapping errors.
+
+        With ``na_action='ignore'``, the transform is never called on rows whose sources are
+        null (like ``Series.map(na_action='ignore')``).  The null rows are found with a
+        vectorized mask, the transform is only evaluated on the rest, and the targets of the
+        null rows are set to missing.  With multiple sources, ``na_how='any'`` (default) skips
+        the rows where any source is null, and ``na_how='all'`` only those where all of them are.
+
+        When the source of a one-to-one map is categorical, the transform is only called once
+        for each category that occurs (and once for missing values, if there are any) rather
+        than for every row, and the results are broadcast back to the rows through the codes.
+        If the transform fails for a category, every row with that category is a mapping
+        error.  With ``categorical=True``, the target is itself categorical (with the distinct
+        results as its categories), which saves memory when there are few distinct results.
+
+        A ``cache`` (see ``pandas_mapper.cache.TransformCache``) persists the results of the
+        transform across runs.  The distinct source values are looked up in the cache all at
+        once, the transform is only evaluated for those that are missing, and their results
+        are written back to it.  The results are keyed by ``cache_key``, which identifies the
+        transform (and should be changed whenever its behavior changes), and by the source
+        values.  It defaults to the qualified name of the transform, so it must be given for
+        lambdas and nested functions.
 
         Args:
           source (str, list): Contains the name or names of the source (input) columns to use.
           target (str, list): Contains the name or names of the target (output) columns that
                               will be generated.
           transform(func, obj): A function that is used to map the source(s) to the target(s).
+          vectorized (boolean): If True, pass whole columns to the transform rather than
+                                individual rows.
+          bisect (boolean): If True, a vectorized transform that raises is retried on
+                            smaller batches so that only the failing rows are errors.
+          memoize (boolean): If True, only evaluate the transform once per distinct
+                             source value.
+          max_concurrency (int): The maximum number of rows that a coroutine transform
+                                 processes concurrently.
+          row_type (str): The type of the rows passed to a transform of multiple source
+                          columns: 'series' (default), 'dict' or 'namedtuple'.
+          dtype (str, type, dict): The dtype of the targets (e.g., 'int64' or 'Int64'), or a
+                                   dict of dtypes by target name.
+          default (obj): The value of a lookup for rows whose keys are not in the table.
+          check_finite (boolean): If True, rows where an expression evaluates to NaN or
+                                  infinity (or a missing value, for non-numeric results)
+                                  are mapping errors.
+          when (str, func): A condition selecting the rows that ``transform`` is applied to.
+          otherwise (func, obj): The transform for the rows that do not match ``when``.  A
+                                 constant is used for all of the targets, unless it is a
+                                 tuple with a value for each target.
+          na_action (str): If 'ignore', do not call the transform on rows with null sources.
+                           The dtype of the targets must then be able to hold missing
+                           values (e.g., 'Int64' rather than 'int64').
+          na_how (str): With ``na_action='ignore'``, skip rows where 'any' (default) or
+                        'all' of the sources are null.
+          categorical (boolean): If True, the target of a map from a categorical source is
+                                 also categorical.
+          cache (TransformCache): A persistent cache of the results of the transform.
+          cache_key (str): The identity of the transform in the cache.
 
         '''
 
@@ -48,15 +376,79 @@ class PdMap:
             self.targets = list(target or [])
 
         self.transform = transform
+        self.vectorized = vectorized
+        self.bisect = bisect
+        self.memoize = memoize
+        self.max_concurrency = max_concurrency
+        self.row_type = row_type
 
-        self.errors = {
-            'indices': [],
-            'results': []
-        }
+        if self.row_type not in ('series', 'dict', 'namedtuple'):
+            raise ValueError('unknown row_type supplied: {}'.format(self.row_type))
 
+        self.dtype = dtype
+        if dtype is None:
+            self._dtypes = {}
+        elif isinstance(dtype, dict):
+            unknown = set(dtype) - set(self.targets)
+            if unknown:
+                raise ValueError('dtype supplied for unknown targets: {}'.format(sorted(unknown)))
+            self._dtypes = {target: pd.api.types.pandas_dtype(dtype[target]) for target in dtype}
+        else:
+            self._dtypes = {target: pd.api.types.pandas_dtype(dtype) for target in self.targets}
+
+        self.errors = PdMapErrors()
+
+        self.default = default
+        self.check_finite = check_finite
+        self.when = when
+        self.otherwise = otherwise
+        self.na_action = na_action
+        self.na_how = na_how
+        self.categorical = categorical
+        self.cache = cache
+        self.cache_key = cache_key
+        self._lookup = None
+
+        if self.na_action not in (None, 'ignore'):
+            raise ValueError('unknown na_action supplied: {}'.format(self.na_action))
+        if self.na_how not in ('any', 'all'):
+            raise ValueError('unknown na_how supplied: {}'.format(self.na_how))
+        if self.na_action == 'ignore':
+            for target, target_dtype in self._dtypes.items():
+                if isinstance(target_dtype, np.dtype) and target_dtype.kind in 'iub':
+                    raise ValueError(
+                        'dtype {} of target "{}" cannot hold the missing values of skipped rows, '
+                        'use a nullable dtype (e.g., "Int64" or "boolean")'.format(target_dtype, target)
+                    )
 
-        if len(self.sources) == 1 and len(self.targets) == 1 and self.transform is None:
+        if self.when is not None:
+            if len(self.sources) == 0:
+                raise ValueError('a condition needs source columns')
+            if isinstance(self.when, str):
+                self._check_expression(self.when)
+            self._when_map = self._branch(self.transform)
+            self._otherwise_map = self._branch(self.otherwise)
+            self._apply = getattr(self, '_apply_conditional')
+        elif len(self.sources) == 1 and len(self.targets) == 1 and self.transform is None:
             self._apply = getattr(self, '_apply_copy')
+        elif isinstance(self.transform, (dict, pd.Series, pd.DataFrame)) and len(self.sources) > 0:
+            self._lookup = self._prepare_lookup()
+            self._apply = getattr(self, '_apply_lookup')
+        elif isinstance(self.transform, str) and len(self.sources) > 0:
+            if len(self.targets) > 1:
+                raise ValueError('an expression can only have a single target')
+            self._check_expression(self.transform)
+            self._apply = getattr(self, '_apply_expression')
+        elif isinstance(self.transform, Coercion):
+            if len(self.sources) != 1 or len(self.targets) > 1:
+                raise ValueError('a coercion must have a single source and target')
+            self._apply = getattr(self, '_apply_coercion')
+        elif inspect.iscoroutinefunction(self.transform) and len(self.sources) > 0:
+            self._apply = getattr(self, '_apply_async')
+        elif self.vectorized and len(self.sources) == 1 and len(self.targets) <= 1:
+            self._apply = getattr(self, '_apply_vectorized_one_to_one')
+        elif self.vectorized and len(self.sources) > 0:
+            self._apply = getattr(self, '_apply_vectorized_many')
         elif len(self.sources) == 1 and len(self.targets) <= 1:
             self._apply = getattr(self, '_apply_one_to_one')
         elif len(self.sources) == 0 and len(self.targets) == 1:
@@ -64,76 +456,784 @@ class PdMap:
                 self._apply = getattr(self, '_apply_zero_to_one')
             else:
                 self._apply = getattr(self, '_apply_constant')
-        elif len(self.targets) == 1:
+        elif len(self.sources) == 0 and len(self.targets) > 1 and not callable(self.transform):
+            if isinstance(self.transform, tuple) and len(self.transform) != len(self.targets):
+                raise ValueError('a constant for several targets must be a tuple with a value for each target')
+            self._apply = getattr(self, '_apply_constant')
+        elif len(self.targets) <= 1:
             self._apply = getattr(self, '_apply_many_to_one')
         else:
             self._apply = getattr(self, '_apply_many_to_many')
 
+        if self.cache is not None:
+            if self.when is not None or len(self.sources) == 0 or not callable(self.transform):
+                raise ValueError('only transforms of source columns can be cached')
+            self._cache_namespace = self._namespace()
+            self._apply_uncached = self._apply
+            self._apply = getattr(self, '_apply_cached')
+
+        # Cached transforms are memoized, so that each distinct value is only looked up once
+        if ((self.memoize or self.cache is not None) and self.when is None and len(self.sources) > 0
+                and callable(self.transform)):
+            self._apply_distinct = self._apply
+            self._apply = getattr(self, '_apply_memoized')
+
+        if self.na_action == 'ignore' and len(self.sources) > 0:
+            self._apply_non_null = self._apply
+            self._apply = getattr(self, '_apply_skipping_na')
+
     def apply(self, source_df, target_df):
+        applied, self.errors = self._evaluate(source_df)
+        self._assign(applied, target_df)
+        return self
+
+    def _evaluate(self, source_df, errors=None):
+        '''
+        Computes the mapped values without modifying any state of the map, so the same map
+        can safely be evaluated concurrently.  Returns the mapped values (None if
+        ``source_df`` is empty) and the errors encountered, which are recorded in
+        ``errors`` if it is given.
+        '''
+
+        self._check_sources(source_df)
+
+        if errors is None:
+            errors = PdMapErrors()
+        if len(source_df) == 0:
+            return None, errors
+
+        applied = self._apply(source_df, errors)
+        if self._dtypes:
+            applied = self._astype(applied, errors)
+        return applied, errors
+
+    def _astype(self, applied, errors):
+        '''Converts the mapped values to the dtype of each target, masking the error rows.'''
+        if len(self.targets) == 1:
+            return _masked_astype(applied, self._dtypes[self.targets[0]], errors)
+
+        return pd.DataFrame(
+            {
+                target: _masked_astype(applied[target], self._dtypes[target], errors)
+                if target in self._dtypes else applied[target]
+                for target in self.targets
+            },
+            index=applied.index
+        )
+
+    def _check_sources(self, source_df):
         for source in self.sources:
             if source not in source_df:
                 raise MissingSourceFieldError('"{}" field not in the source dataframe'.format(source))
 
-        if len(source_df) > 0:
-            applied_df = self._apply(source_df)
+    @property
+    def _row_wise(self):
+        '''True if the transform is called with a row of the source columns.'''
+        return self._apply in (self._apply_many_to_one, self._apply_many_to_many)
 
-            if len(self.targets) == 1:
-                target_df[self.targets[0]] = applied_df
-            else:
-                for target in self.targets:
-                    target_df[target] = applied_df[target]
-        else:
-            for target in self.targets:
-                target_df[target] = None
+    def _assign(self, applied, target_df):
+        for target, values in self._columns(applied).items():
+            target_df[target] = values
 
-        return self
+    def _columns(self, applied):
+        '''Returns the values of each target column, given the result of ``_evaluate``.'''
+        if applied is None:
+            return {
+                target: pd.array([], dtype=self._dtypes[target]) if target in self._dtypes else None
+                for target in self.targets
+            }
+        elif len(self.targets) == 1:
+            return {self.targets[0]: applied}
+        return {target: applied[target] for target in self.targets}
+
+
+    def _error_result(self, arg, err):
+        if len(self.targets) > 1:
+            return [(arg, err)] * len(self.targets)
+        return (arg, err)
+
+    def _error_args(self, source_df, positions):
+        '''Recovers the arguments passed to the transform for the rows at ``positions``.'''
+        if len(self.sources) == 1 and len(self.targets) <= 1:
+            return list(source_df[self.sources[0]].take(positions))
+        return self._rows(source_df[self.sources].take(positions))
+
+    def _rows(self, rows_df):
+        '''Returns the rows of ``rows_df`` in the form given to the transform.'''
+        if self.row_type == 'dict':
+            return rows_df.to_dict('records')
+        elif self.row_type == 'namedtuple':
+            return list(rows_df.itertuples(index=False, name='Row'))
+        return [row for _, row in rows_df.iterrows()]
 
+    def _target_values(self, result):
+        '''Returns the value of each target from the result of a multi-target transform.'''
+        if isinstance(result, tuple):
+            if len(result) != len(self.targets):
+                raise ValueError('expected {} target values, got {}'.format(len(self.targets), len(result)))
+            return list(result)
+        return [result[target] for target in self.targets]
 
-    def _try_transform(self, arg, idx):
+    def _try_transform(self, arg, position, errors):
         try:
             result = self.transform(arg)
+            if len(self.targets) > 1:
+                result = self._target_values(result)
         except Exception as err:
-            err_result = (arg, err)
-            result = [err_result] * len(self.targets)
+            result = self._error_result(arg, err)
+            errors.append(position, err)
+        return result
+
+
+    def _try_vectorized_transform(self, arg, errors, offset=0):
+        try:
+            if isinstance(self.transform, str):
+                result = arg.eval(self.transform)
+            else:
+                result = self.transform(arg)
+            result = self._coerce_vectorized_result(result, arg.index)
+        except Exception as err:
+            if self.bisect and len(arg) > 1:
+                middle = len(arg) // 2
+                return pd.concat([
+                    self._try_vectorized_transform(arg.iloc[:middle], errors, offset),
+                    self._try_vectorized_transform(arg.iloc[middle:], errors, offset + middle)
+                ])
 
-            self.errors['indices'].append(idx)
-            self.errors['results'].append(err_result)
+            result = self._coerce_vectorized_result(None, arg.index)
+            errors.extend(np.arange(offset, offset + len(arg)), err)
         return result
 
+    async def _try_async_transform(self, arg):
+        result = await self.transform(arg)
+        if len(self.targets) > 1:
+            return self._target_values(result)
+        return result
+
+    async def _gather_async(self, args, errors):
+        results = [None] * len(args)
+        pending = iter(enumerate(args))
+
+        async def worker():
+            for position, arg in pending:
+                try:
+                    results[position] = await self._try_async_transform(arg)
+                except Exception as err:
+                    results[position] = self._error_result(arg, err)
+                    errors.append(position, err)
 
-    def _transform_one_to_one(self, row):
-        return self._try_transform(row[self.sources[0]], row.name)
+        await asyncio.gather(*[worker() for _ in range(min(self.max_concurrency, len(args)))])
+        return results
+
+    @staticmethod
+    def _run_coroutine(coroutine):
+        # asyncio.get_running_loop is only available from Python 3.7
+        if asyncio._get_running_loop() is None:
+            return _run_in_new_loop(coroutine)
 
-    def _transform_zero_to_one(self, row):
-        return self._try_transform(row['__none__'], row.name)
+        # An event loop is already running in this thread (e.g., in a notebook), so
+        # the coroutine needs its own loop in another thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(_run_in_new_loop, coroutine).result()
 
-    def _transform_many_to_one(self, row):
-        return self._try_transform(row.copy(), row.name)
+    def _coerce_vectorized_result(self, result, index):
+        result = _aligned(result, index, 'vectorized transform result')
 
-    def _transform_many_to_many(self, row):
-        return self._try_transform(row.copy(), row.name)
+        if len(self.targets) > 1:
+            if result is None:
+                return pd.DataFrame(None, index=index, columns=self.targets)
+            return pd.DataFrame(result, index=index)[self.targets]
+
+        if result is None:
+            return pd.Series(None, index=index, dtype=object)
+        if isinstance(result, pd.Series):
+            return result
+        return pd.Series(result, index=index)
+
+
+    def _transform_row(self, row, labels, errors):
+        # Rows are indexed by position, but the transform sees the original row label
+        arg = row.copy()
+        arg.name = labels[row.name]
+        return self._try_transform(arg, row.name, errors)
+
+    def _transform_rows(self, source_df, errors):
+        return _transform_rows([self], source_df, [errors])[0]
+
+    def _rows_result(self, results, index):
+        # Typed results are converted later, so there is no point inferring their type here
+        dtype = object if self._dtypes else None
+        if len(self.targets) > 1:
+            return pd.DataFrame(results, index=index, columns=self.targets, dtype=dtype)
+        return pd.Series(results, index=index, dtype=dtype)
+
+
+    def _apply_copy(self, source_df, errors):
+        # The column is copied when it is added to the target (or lazily, with copy-on-write)
+        return source_df[self.sources[0]]
+
+    def _prepare_lookup(self):
+        '''Returns the (unique) keys of a lookup table, along with the values for each target.'''
+        table = self.transform
+        if isinstance(table, dict):
+            keys = list(table.keys())
+            try:
+                if len(self.sources) == 1:
+                    index = pd.Index(keys)
+                elif len(keys) == 0:
+                    index = pd.MultiIndex.from_arrays([[]] * len(self.sources))
+                else:
+                    index = pd.MultiIndex.from_tuples(keys)
+            except TypeError:
+                raise ValueError('lookup keys must be tuples of the source values')
+            table = pd.Series(list(table.values()), index=index, dtype=object if len(keys) == 0 else None)
+
+        if isinstance(table, pd.Series):
+            if len(self.targets) > 1:
+                raise ValueError('a lookup series can only have a single target')
+            values = {target: _lookup_values(table) for target in self.targets}
+        elif len(self.targets) == 1 and len(table.columns) == 1:
+            values = {self.targets[0]: _lookup_values(table.iloc[:, 0])}
+        else:
+            missing = [target for target in self.targets if target not in table.columns]
+            if missing:
+                raise ValueError('lookup dataframe has no columns for targets: {}'.format(missing))
+            values = {target: _lookup_values(table[target]) for target in self.targets}
 
+        if table.index.nlevels != len(self.sources):
+            raise ValueError('lookup keys have {} levels, but the map has {} sources'.format(
+                table.index.nlevels, len(self.sources)
+            ))
+        if not table.index.is_unique:
+            raise ValueError('lookup keys must be unique')
 
-    def _apply_copy(self, source_df):
-        return source_df[self.sources[0]].copy()
+        return table.index, values
 
-    def _apply_constant(self, source_df):
+    def _apply_lookup(self, source_df, errors):
+        index, values = self._lookup
+        if len(self.sources) == 1:
+            keys = pd.Index(source_df[self.sources[0]])
+        else:
+            keys = pd.MultiIndex.from_arrays([source_df[source] for source in self.sources])
+
+        indexer = index.get_indexer(keys)
+        unmatched = np.flatnonzero(indexer == -1)
+
+        fill_value = None
+        if self.default is not _UNSET:
+            fill_value = self.default
+        else:
+            errors.extend(unmatched, [KeyError(key) for key in keys.take(unmatched)])
+            # Unmatched rows are dropped, so any value that keeps the dtype will do
+            if len(index) > 0:
+                indexer[unmatched] = 0
+
+        columns = {
+            target: pd.api.extensions.take(target_values, indexer, allow_fill=True, fill_value=fill_value)
+            for target, target_values in values.items()
+        }
+
+        if len(self.targets) == 1:
+            return pd.Series(columns[self.targets[0]], index=source_df.index)
+        return pd.DataFrame(columns, index=source_df.index, columns=self.targets)
+
+    def _apply_constant(self, source_df, errors):
+        if len(self.targets) > 1:
+            values = self.transform if isinstance(self.transform, tuple) else (self.transform,) * len(self.targets)
+            return pd.DataFrame(
+                {target: [value] * len(source_df) for target, value in zip(self.targets, values)},
+                index=source_df.index
+            )
         return pd.Series([self.transform] * len(source_df), source_df.index)
 
-    def _apply_zero_to_one(self, source_df):
+    def _apply_zero_to_one(self, source_df, errors):
         return pd.Series([self.transform() for i in range(len(source_df))], source_df.index)
 
-    def _apply_one_to_one(self, source_df):
-        return source_df[self.sources].apply(self._transform_one_to_one, axis=1)
+    def _apply_one_to_one(self, source_df, errors):
+        if isinstance(source_df[self.sources[0]].dtype, pd.CategoricalDtype):
+            return self._apply_categories(source_df[self.sources[0]], errors)
+
+        return self._rows_result(
+            [
+                self._try_transform(value, position, errors)
+                for position, value in enumerate(source_df[self.sources[0]])
+            ],
+            source_df.index
+        )
+
+    def _apply_many_to_one(self, source_df, errors):
+        return self._rows_result(self._transform_rows(source_df, errors), source_df.index)
+
+    def _apply_many_to_many(self, source_df, errors):
+        return self._rows_result(self._transform_rows(source_df, errors), source_df.index)
+
+    def _apply_async(self, source_df, errors):
+        if len(self.sources) == 1 and len(self.targets) <= 1:
+            args = list(source_df[self.sources[0]])
+        else:
+            args = self._rows(source_df[self.sources])
+
+        results = self._run_coroutine(self._gather_async(args, errors))
+        return self._rows_result(results, source_df.index)
+
+    def _apply_categories(self, values, errors):
+        categories = values.cat.categories
+
+        # Only the categories that occur are transformed, along with missing values (code -1)
+        # if there are any, so the codes are renumbered to index the categories that are used
+        shifted_codes = values.cat.codes.to_numpy().astype(np.int64) + 1
+        used = np.flatnonzero(np.bincount(shifted_codes, minlength=len(categories) + 1))
+        renumbered = np.empty(len(categories) + 1, dtype=np.int64)
+        renumbered[used] = np.arange(len(used))
+        codes = renumbered[shifted_codes]
+
+        category_errors = _ForwardedErrors(errors, codes=codes)
+        results = [
+            self._try_transform(np.nan if code == 0 else categories[code - 1], position, category_errors)
+            for position, code in enumerate(used)
+        ]
+
+        if self.categorical and not self._dtypes:
+            # Failed categories are missing, rather than categories of their own
+            category_results = pd.Series(results, dtype=object)
+            category_results.iloc[category_errors.positions] = None
+
+            # Unhashable results cannot be categories
+            if _hashable(category_results):
+                result_codes, result_categories = pd.factorize(category_results)
+                return pd.Series(
+                    pd.Categorical.from_codes(result_codes[codes], categories=result_categories),
+                    index=values.index
+                )
+
+        applied = self._rows_result(results, pd.RangeIndex(len(results))).iloc[codes]
+        applied.index = values.index
+        return applied
+
+    def _apply_memoized(self, source_df, errors):
+        if (len(self.sources) == 1 and self._apply_distinct == self._apply_one_to_one
+                and isinstance(source_df[self.sources[0]].dtype, pd.CategoricalDtype)):
+            # The categories are already the distinct values
+            return self._apply_distinct(source_df, errors)
+
+        if not all(_hashable(source_df[source]) for source in self.sources):
+            # Unhashable source values cannot be memoized
+            return self._apply_distinct(source_df, errors)
+
+        # Missing values are all given the code -1, which is a distinct value like any other
+        codes = []
+        for source in self.sources:
+            values = source_df[source]
+            codes.append(pd.factorize(values)[0])
+            if values.dtype == object:
+                # Values that compare equal but have different types (e.g., 1, 1.0 and True,
+                # or None and NaN) are distinct values
+                codes.append(pd.factorize(np.array([type(value) for value in values], dtype=object))[0])
+
+        _, first_positions, codes = np.unique(
+            np.column_stack(codes), axis=0, return_index=True, return_inverse=True
+        )
+        codes = codes.reshape(-1)
+
+        # The distinct rows are ordered by code, so their errors are forwarded to every row
+        # that carries the same code
+        distinct_applied = self._apply_distinct(
+            source_df.iloc[first_positions], _ForwardedErrors(errors, codes=codes)
+        )
+
+        applied = distinct_applied.iloc[codes]
+        applied.index = source_df.index
+        return applied
+
+    def _namespace(self):
+        '''Returns the identity of the transform (and targets) that its results are cached under.'''
+        cache_key = self.cache_key
+        if cache_key is None:
+            qualname = getattr(self.transform, '__qualname__', None)
+            if qualname is None or '<' in qualname:
+                raise ValueError('a cache_key is needed to cache transform {!r}'.format(self.transform))
+            cache_key = '{}.{}'.format(self.transform.__module__, qualname)
+
+        # The cached results of several targets depend on which targets they are
+        if len(self.targets) > 1:
+            return '{}:{}'.format(cache_key, ','.join(self.targets))
+        return cache_key
+
+    def _cache_keys(self, source_df):
+        '''Returns the pickled source values of each row (None if they cannot be pickled).'''
+        if len(self.sources) == 1:
+            values = source_df[self.sources[0]]
+        else:
+            values = zip(*(source_df[source] for source in self.sources))
+
+        keys = []
+        for value in values:
+            try:
+                keys.append(pickle.dumps(value, protocol=4))
+            except Exception:
+                keys.append(None)
+        return keys
+
+    def _apply_cached(self, source_df, errors):
+        keys = self._cache_keys(source_df)
+        cached = self.cache.get_many(self._cache_namespace, [key for key in keys if key is not None])
+        missing = np.array([position for position, key in enumerate(keys) if key not in cached], dtype=np.int64)
+
+        # The results are always rebuilt from the values of each row, whether they were
+        # cached or computed, so that the output does not depend on what was in the cache
+        results = [None] * len(keys)
+        failures = {}
+
+        # Failures are only cached (and so replayed) when the cache is asked to
+        for position, key in enumerate(keys):
+            if key in cached:
+                value, failed = cached[key]
+                if failed:
+                    failures[position] = value
+                else:
+                    results[position] = value
+        if failures:
+            errors.extend(list(failures), list(failures.values()))
+
+        if len(missing) > 0:
+            missing_errors = _ForwardedErrors(errors, positions=missing)
+            computed = self._apply_uncached(source_df.take(missing), missing_errors)
+            computed_failures = dict(zip(missing_errors.positions, missing_errors.exceptions))
+
+            if len(self.targets) > 1:
+                computed_values = list(zip(*(computed[target].to_numpy(dtype=object) for target in self.targets)))
+            else:
+                computed_values = list(computed.to_numpy(dtype=object))
+
+            computed_items = []
+            for computed_position, position in enumerate(missing):
+                failed = computed_position in computed_failures
+                if failed:
+                    value = failures[position] = computed_failures[computed_position]
+                else:
+                    value = results[position] = computed_values[computed_position]
+                if keys[position] is not None:
+                    computed_items.append((keys[position], value, failed))
+            self.cache.set_many(self._cache_namespace, computed_items)
+
+        if failures:
+            positions = np.array(sorted(failures), dtype=np.int64)
+            for position, arg in zip(positions, self._error_args(source_df, positions)):
+                results[position] = self._error_result(arg, failures[position])
+
+        return self._rows_result(results, source_df.index)
+
+    def _apply_vectorized_one_to_one(self, source_df, errors):
+        return self._try_vectorized_transform(source_df[self.sources[0]], errors)
+
+    def _apply_vectorized_many(self, source_df, errors):
+        return self._try_vectorized_transform(source_df[self.sources], errors)
+
+    def _branch(self, transform):
+        '''Returns the map for one branch of a condition (None if the branch was not given).'''
+        if transform is _UNSET:
+            return None
+
+        # A constant is broadcast to every target (or given per target, as a tuple), except
+        # that None keeps its usual meaning of copying the source of a one-to-one map
+        constant = not callable(transform) and not isinstance(transform, (str, dict, pd.Series, pd.DataFrame))
+        if constant and (transform is not None or len(self.targets) > 1):
+            return PdMap(target=self.targets, transform=transform)
+
+        return PdMap(
+            source=self.sources,
+            target=self.targets,
+            transform=transform,
+            vectorized=self.vectorized,
+            bisect=self.bisect,
+            memoize=self.memoize,
+            max_concurrency=self.max_concurrency,
+            row_type=self.row_type,
+            default=self.default,
+            check_finite=self.check_finite
+        )
+
+    def _condition(self, source_df):
+        '''Evaluates the condition, returning a boolean mask (missing values do not match).'''
+        if isinstance(self.when, str):
+            matches = source_df[self.sources].eval(self.when)
+        elif len(self.sources) == 1:
+            matches = self.when(source_df[self.sources[0]])
+        else:
+            matches = self.when(source_df[self.sources])
+        matches = _aligned(matches, source_df.index, 'condition result')
+        return pd.array(np.asarray(matches), dtype='boolean').fillna(False).to_numpy(dtype=bool)
+
+    def _apply_conditional(self, source_df, errors):
+        try:
+            matches = self._condition(source_df)
+        except Exception as err:
+            errors.extend(np.arange(len(source_df)), err)
+            return self._coerce_vectorized_result(None, source_df.index)
+
+        branches = []
+        for branch, positions in [
+            (self._when_map, np.flatnonzero(matches)),
+            (self._otherwise_map, np.flatnonzero(~matches))
+        ]:
+            if len(positions) == 0:
+                continue
+
+            subset_df = source_df.take(positions)
+            if branch is None:
+                errors.extend(positions, ValueError('row does not match condition {!r}'.format(self.when)))
+                applied = self._coerce_vectorized_result(None, subset_df.index)
+            else:
+                applied, _ = branch._evaluate(subset_df, _ForwardedErrors(errors, positions=positions))
+            branches.append((positions, applied))
 
-    def _apply_many_to_one(self, source_df):
-        return source_df[self.sources].apply(self._transform_many_to_one, axis=1)
+        # Stitch the branches back together in row order
+        positions = np.concatenate([branch_positions for branch_positions, _ in branches])
+        applied = pd.concat([branch_applied for _, branch_applied in branches])
+        order = np.empty(len(positions), dtype=np.int64)
+        order[positions] = np.arange(len(positions))
+        applied = applied.iloc[order]
+        applied.index = source_df.index
+        return applied
 
-    def _apply_many_to_many(self, source_df):
-        return source_df[self.sources].apply(self._transform_many_to_many, axis=1)
+    def _apply_skipping_na(self, source_df, errors):
+        nulls = source_df[self.sources].isna()
+        skipped = (nulls.any(axis=1) if self.na_how == 'any' else nulls.all(axis=1)).to_numpy()
+        if not skipped.any():
+            return self._apply_non_null(source_df, errors)
+
+        positions = np.flatnonzero(~skipped)
+        if len(positions) == 0:
+            return self._coerce_vectorized_result(None, source_df.index)
+
+        applied = self._apply_non_null(source_df.take(positions), _ForwardedErrors(errors, positions=positions))
+
+        # The null rows are filled with missing values by reindexing on the row positions
+        applied = applied.set_axis(positions).reindex(np.arange(len(source_df)))
+        applied.index = source_df.index
+        return applied
+
+    def _apply_coercion(self, source_df, errors):
+        values = source_df[self.sources[0]]
+        try:
+            applied = self.transform(values)
+        except Exception as err:
+            # Like a failing vectorized transform, every row is an error
+            errors.extend(np.arange(len(values)), err)
+            return self._coerce_vectorized_result(None, values.index)
+
+        if not isinstance(applied, pd.Series) or not applied.index.equals(values.index):
+            applied = pd.Series(applied, index=values.index)
+
+        # Values that were there before, but not after the conversion, could not be converted
+        failed = np.flatnonzero(values.notna().to_numpy() & applied.isna().to_numpy())
+        errors.extend(failed, [self.transform.error(value) for value in values.take(failed)])
+        return applied
+
+    def _check_expression(self, expression):
+        '''Checks that an expression only uses the source columns, and has a single result.'''
+
+        # Errors that depend on the types of the columns can only be found with the data
+        empty_df = pd.DataFrame({source: pd.Series(dtype=float) for source in self.sources})
+        try:
+            result = empty_df.eval(expression)
+        except NameError as err:
+            raise ValueError('expression "{}" uses a column that is not a source: {}'.format(expression, err))
+        except SyntaxError as err:
+            raise ValueError('invalid expression "{}": {}'.format(expression, err))
+        except Exception:
+            return
+
+        if isinstance(result, pd.DataFrame):
+            raise ValueError('expression "{}" must not assign columns'.format(expression))
+
+    def _apply_expression(self, source_df, errors):
+        applied = self._try_vectorized_transform(source_df[self.sources], errors)
+        if self.check_finite:
+            _check_finite(applied, errors)
+        return applied
+
+def _aligned(result, index, description):
+    '''
+    Returns a series or dataframe result in the order of ``index``.  Results may be
+    reordered, but a ValueError is raised if they have rows missing, added or relabeled.
+    Other results (e.g., arrays) are returned as they are.
+    '''
+
+    if isinstance(result, (pd.Series, pd.DataFrame)) and not result.index.equals(index):
+        if len(result) != len(index) or not result.index.is_unique or not result.index.isin(index).all():
+            raise ValueError('{} is not indexed like its input'.format(description))
+        result = result.reindex(index)
+    return result
+
+def _run_in_new_loop(coroutine):
+    '''Runs a coroutine to completion in a new event loop (like ``asyncio.run``, from Python 3.7).'''
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+def _hashable(values):
+    '''Returns True if all of the values of a series are hashable.'''
+    if values.dtype != object:
+        return True
+    try:
+        for value in values:
+            hash(value)
+    except TypeError:
+        return False
+    return True
+
+def _check_finite(values, errors):
+    '''Records rows (without errors already) whose values are NaN, infinite or missing.'''
+    if pd.api.types.is_numeric_dtype(values.dtype) and not pd.api.types.is_bool_dtype(values.dtype):
+        invalid = ~np.isfinite(values.to_numpy(dtype=float, na_value=np.nan))
+    else:
+        invalid = values.isna().to_numpy()
+
+    positions = np.setdiff1d(np.flatnonzero(invalid), errors.positions)
+    errors.extend(
+        positions,
+        [ValueError('expression result is not finite: {}'.format(value)) for value in values.take(positions)]
+    )
+
+def _lookup_values(series):
+    '''Returns the values of a series as an array that ``take`` accepts.'''
+    if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+        return series.array
+    return series.to_numpy()
+
+def _masked_astype(values, dtype, errors):
+    '''
+    Converts a series to ``dtype``, masking the rows with errors.  Rows whose values cannot
+    be converted (exactly, for numpy integer dtypes) are recorded in ``errors`` and masked too.
+    '''
+
+    # Dtypes without a missing value get zeros, which are dropped with the error rows
+    fill = dtype.type(0) if isinstance(dtype, np.dtype) and dtype.kind in 'iub' else None
+
+    positions = errors.positions
+    if len(positions) > 0:
+        masked = values.to_numpy(dtype=object, copy=True)
+        masked[positions] = fill
+        values = pd.Series(masked, index=values.index)
+
+    try:
+        converted = values.astype(dtype)
+    except (TypeError, ValueError, OverflowError):
+        masked = values.to_numpy(dtype=object, copy=True)
+        for position, value in enumerate(masked):
+            try:
+                pd.array([value], dtype=object).astype(dtype)
+            except (TypeError, ValueError, OverflowError) as err:
+                errors.append(position, err)
+                masked[position] = fill
+        values = pd.Series(masked, index=values.index)
+        converted = values.astype(dtype)
+
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        # Numpy silently truncates fractions (and wraps integers that do not fit), so the
+        # values that the conversion changed could not be converted either
+        numbers = pd.to_numeric(values, errors='coerce')
+        lossy = np.flatnonzero((numbers.notna() & (numbers != converted)).to_numpy(dtype=bool))
+        if len(lossy) > 0:
+            errors.extend(
+                lossy,
+                [ValueError('cannot convert {!r} to {} exactly'.format(value, dtype)) for value in values.take(lossy)]
+            )
+            converted.iloc[lossy] = fill
+    return converted
+
+def _transform_rows(pd_maps, source_df, map_errors):
+    '''
+    Transforms the rows of ``source_df`` with row-wise maps that all have the same sources,
+    in a single pass over the rows.  Returns a list of the results of each map.
+    '''
+
+    rows_df = source_df[pd_maps[0].sources]
+
+    if pd_maps[0].row_type != 'series':
+        results = [[] for pd_map in pd_maps]
+        for position, row in enumerate(pd_maps[0]._rows(rows_df)):
+            for map_idx, (pd_map, errors) in enumerate(zip(pd_maps, map_errors)):
+                # Every map but the last gets its own copy of a (mutable) dict row
+                arg = dict(row) if isinstance(row, dict) and map_idx < len(pd_maps) - 1 else row
+                results[map_idx].append(pd_map._try_transform(arg, position, errors))
+        return results
+
+    rows_df.index = pd.RangeIndex(len(rows_df))
+    labels = source_df.index
+
+    def transform_row(row):
+        return [pd_map._transform_row(row, labels, errors) for pd_map, errors in zip(pd_maps, map_errors)]
+
+    results = rows_df.apply(transform_row, axis=1, result_type='reduce')
+    return [list(map_results) for map_results in zip(*results)]
+
+def _evaluate_fused(pd_maps, source_df, map_errors):
+    '''Evaluates row-wise maps that have the same sources, like ``PdMap._evaluate``.'''
+    if len(pd_maps) == 1:
+        return [pd_maps[0]._evaluate(source_df, map_errors[0])[0]]
+
+    pd_maps[0]._check_sources(source_df)
+    if len(source_df) == 0:
+        return [None] * len(pd_maps)
+
+    applied = []
+    for pd_map, errors, results in zip(pd_maps, map_errors, _transform_rows(pd_maps, source_df, map_errors)):
+        map_applied = pd_map._rows_result(results, source_df.index)
+        if pd_map._dtypes:
+            map_applied = pd_map._astype(map_applied, errors)
+        applied.append(map_applied)
+    return applied
+
+def _independent_stages(maps, inplace):
+    '''
+    Splits the maps into runs of consecutive maps that can be evaluated concurrently.
+    Maps only depend on each other when mapping inplace, where a map may read the
+    targets of an earlier map.
+
+    Within a stage, row-wise maps with the same sources (and row type) are fused into a single group that
+    is evaluated in one pass over the rows, so each stage is a list of groups of maps.
+    '''
+
+    stages = [[]]
+    stage_targets = set()
+    stage_groups = {}
+    for map_idx, pd_map in enumerate(maps):
+        if inplace and stage_targets.intersection(pd_map.sources):
+            stages.append([])
+            stage_targets = set()
+            stage_groups = {}
+        stage_targets.update(pd_map.targets)
+
+        if pd_map._row_wise:
+            key = (tuple(pd_map.sources), pd_map.row_type)
+            if key in stage_groups:
+                stage_groups[key].append(map_idx)
+                continue
+            stage_groups[key] = [map_idx]
+            stages[-1].append(stage_groups[key])
+        else:
+            stages[-1].append([map_idx])
+    return stages
+
+def _apply_maps_to_shard(shard, maps, inplace, error_limit):
+    '''Applies maps to a shard of a dataframe in a worker process.'''
+    # The shard is already a private copy of the source rows
+    mapper = PdMapper(shard, maps, inplace=inplace, max_errors=error_limit, copy=False)
+    try:
+        mapper._apply_stages()
+    except _ErrorLimitExceeded:
+        # The targets of the stage that was stopped were not added, so its sources are intact
+        mapper._capture_error_args(range(len(maps)))
+    return mapper.mapped, mapper._map_errors, mapper._captured_args
 
 class PdMapper:
-    def __init__(self, source_df, maps, inplace=False, on_error='raise'):
+    def __init__(self, source_df, maps, inplace=False, on_error='raise', executor=None, workers=None,
+                 max_errors=None, log_errors='summary', log_samples=5, copy=True, na_action=None):
         '''
         Takes a list of maps, applies them, and redirects any errors.
 
@@ -141,34 +1241,85 @@ class PdMapper:
           source_df (pd.DataFrame): The dataframe to apply the mapping to.
           maps (list): A list of tuples or ``PdMap``s that define the mapping.  If a list of
                        tuples is supplied, the 0th element of the tuple is the source field(s),
-                       the 1st element is the target field(s), and the (optional) 2nd element is the
-                       transform.
+                       the 1st element is the target field(s), the (optional) 2nd element is the
+                       transform, and the (optional) 3rd element is a dict of keyword
+                       options passed to ``PdMap`` (e.g., ``{'vectorized': True}``).  A
+                       compiled ``MappingPlan`` may also be given.
           inplace (boolean): If True, do operation inplace.
           on_error (str): 'raise' (default) will raise an error if any mapping errors
                           are encountered.  'redirect' will exclude any error records from the
                           main output (e.g., ``mapped`` attribute) and place them in a
                           dataframe accessible through the ``errors`` attribute.
+          executor (str): None (default) applies the maps in the current process.  'process'
+                          splits ``source_df`` into contiguous row ranges and applies the maps
+                          to each range in a pool of worker processes.  The maps (and their
+                          transforms) must be picklable when using a process executor.
+                          'thread' evaluates independent maps concurrently in a pool of
+                          threads, which helps when transforms release the GIL or block on I/O.
+                          Maps that read the targets of earlier maps (when ``inplace=True``)
+                          wait for those maps to finish.
+          workers (int): The number of workers to use (defaults to the number of CPUs).
+          max_errors (int, float): If set, mapping stops as soon as there are more than
+                                   ``max_errors`` errors (or more than this fraction of
+                                   the rows have errors, if it is a float), and a
+                                   ``PdMappingError`` is raised with the errors collected so
+                                   far, regardless of ``on_error``.  Use ``max_errors=0`` to
+                                   fail fast on the first error.  With an executor, the
+                                   limit is enforced per worker and checked again once the
+                                   workers are done.
+          log_errors (str): 'summary' (default) logs the number of errors for each map,
+                            exception type and message, along with up to ``log_samples``
+                            example rows for each.  'rows' logs every error row.  None
+                            disables logging errors.
+          log_samples (int): The number of example rows logged for each group of errors
+                             when ``log_errors='summary'``.
+          copy (boolean): If True (default), transforms are given a copy of ``source_df``
+                          so that they can never modify it.  With pandas copy-on-write
+                          enabled, the copy is lazy and no data is copied unless a
+                          transform writes to it.  If False, ``source_df`` is always shared
+                          with the transforms, which must then not modify their inputs.
+                          Ignored when ``inplace=True``.
+          na_action (str): The ``na_action`` of the maps given as tuples that do not set
+                           their own (e.g., 'ignore' to never call their transforms on null
+                           sources).
 
         Attributes:
           mapped (pd.DataFrame): A dataframe containing the result of the mapping operation.
           errors (pd.DataFrame): A dataframe containing any records excluded from the main
-                                 ``mapped`` dataframe when ``on_error='redirect'``.
+                                 ``mapped`` dataframe when ``on_error='redirect'``.  It is
+                                 only built when it is first accessed.
+          error_count (int): The number of mapping errors.
         '''
 
         if inplace:
             self.source_df = source_df
             self.mapped = source_df
         else:
-            self.source_df = source_df.copy()
+            self.source_df = source_df.copy(deep=copy and not _copy_on_write())
             self.mapped = pd.DataFrame(index=self.source_df.index)
 
-        self.maps = self._coerce_maps(maps)
-        self.idx_errors = []
-        self.errors = pd.DataFrame([])
+        self.inplace = inplace
+        self.maps = self._coerce_maps(maps, na_action)
+        if isinstance(maps, MappingPlan) and maps.inplace == inplace:
+            self._stages = maps.stages
+        else:
+            self._stages = None
+        self._map_errors = [PdMapErrors() for pd_map in self.maps]
+        self._captured_args = {}
+        self._collect_errors()
         self.on_error = on_error
+        self.executor = executor
+        self.workers = workers or os.cpu_count() or 1
+        self.max_errors = max_errors
+        self.log_errors = log_errors
+        self.log_samples = log_samples
 
     @staticmethod
-    def _coerce_maps(maps):
+    def _coerce_maps(maps, na_action=None):
+        if isinstance(maps, MappingPlan):
+            return maps.maps
+
+        defaults = {} if na_action is None else {'na_action': na_action}
         coerced = []
         for amap in maps:
             if isinstance(amap, PdMap):
@@ -178,56 +1329,389 @@ class PdMapper:
                     PdMap(
                         source=amap[0] if len(amap) > 0 else None,
                         target=amap[1] if len(amap) > 1 else None,
-                        transform=amap[2] if len(amap) > 2 else None
+                        transform=amap[2] if len(amap) > 2 else None,
+                        **{**defaults, **(amap[3] if len(amap) > 3 else {})}
                     )
                 )
         return coerced
 
-    def _collect_errors(self):
-        self.idx_errors = [idx for pd_map in self.maps for idx in pd_map.errors['indices']]
-        errors = [
-            {
-                'msg': '{}({}): {}'.format(err[1].__class__.__name__, err[0], err[1]),
-                'err': err[1],
-                'arg': err[0],
-                'sources': pd_map.sources,
-                'targets': pd_map.targets,
-                'transform': pd_map.transform
-            }
-            for pd_map in self.maps for err in pd_map.errors['results']
-        ]
+    @classmethod
+    def stream(cls, chunks, maps, **kwargs):
+        '''
+        Applies a mapping to each dataframe in an iterable of dataframes, so that large
+        datasets can be mapped without ever holding all of the data in memory.
+
+        Args:
+          chunks (iterable): Dataframes to map (e.g., ``pd.read_csv(..., chunksize=N)``).
+          maps (list): A list of tuples or ``PdMap``s that define the mapping (see ``PdMapper``).
+          **kwargs: Any other ``PdMapper`` options (e.g., ``on_error``), which apply to each
+                    chunk.  When ``on_error='raise'``, the error is raised as soon as a chunk
+                    with errors is mapped.
 
-        self.errors = self.source_df.merge(
-            pd.DataFrame({'__error__': errors}, index=self.idx_errors),
-            how='inner',
-            left_index=True,
-            right_index=True
+        Yields:
+          tuple: A ``(mapped, errors)`` pair of dataframes for each chunk.
+        '''
+
+        maps = cls._coerce_maps(maps, kwargs.get('na_action'))
+        for chunk in chunks:
+            mapper = cls(chunk, maps, **kwargs).apply()
+            yield mapper.mapped, mapper.errors
+
+    @property
+    def error_count(self):
+        '''The number of mapping errors, available without building ``errors``.'''
+        return sum(len(errors) for errors in self._map_errors)
+
+    def error_summary(self):
+        '''
+        Summarizes the mapping errors without building ``errors``.
+
+        Returns:
+          pd.DataFrame: One row for each map, exception type and message template, with
+                        the ``sources`` and ``targets`` of the map, the exception ``type``,
+                        the exception ``message`` (with quoted strings and numbers masked),
+                        and the ``count`` of rows that raised it.
+        '''
+
+        return pd.DataFrame(
+            [
+                {
+                    'sources': pd_map.sources,
+                    'targets': pd_map.targets,
+                    'type': err_type,
+                    'message': message,
+                    'count': len(group)
+                }
+                for _, pd_map, errors, err_type, message, group in self._error_groups()
+            ],
+            columns=['sources', 'targets', 'type', 'message', 'count']
         )
 
-    def _handle_errors(self):
-        if len(self.errors) == 0:
+    def _error_groups(self):
+        '''
+        Groups the errors of each map by exception type and message template.  Yields the
+        index of the map, the map, its errors, the type, the message template, and the
+        indices of the errors in the group.
+        '''
+
+        for map_idx, (pd_map, errors) in enumerate(zip(self.maps, self._map_errors)):
+            if len(errors) == 0:
+                continue
+
+            grouped = pd.DataFrame({
+                'type': errors.types,
+                'message': errors.templates
+            }).groupby(['type', 'message'], sort=False)
+
+            # Groups are listed in order of their first error
+            for (err_type, message), group in sorted(grouped.indices.items(), key=lambda item: item[1][0]):
+                yield map_idx, pd_map, errors, err_type, message, group
+
+    @property
+    def errors(self):
+        '''
+        A dataframe containing the source records of any mapping errors, along with the
+        details of each error in the ``__error__`` column.  It is only built when accessed.
+        '''
+
+        if self._errors is None:
+            self._errors = self._error_rows()
+            self._errors['__error__'] = np.array(self._error_details(), dtype=object)
+        return self._errors
+
+    def _collect_errors(self):
+        # Error rows are listed in row order, and then by map for rows with several errors
+        self._error_positions = np.concatenate(
+            [np.empty(0, dtype=np.int64)] + [errors.positions for errors in self._map_errors]
+        )
+        self._error_order = np.argsort(self._error_positions, kind='stable')
+        self._error_mask = np.zeros(len(self.source_df), dtype=bool)
+        self._error_mask[self._error_positions] = True
+        self._errors = None
+        self._error_rows_cache = None
+        self._error_details_cache = None
+
+    @property
+    def idx_errors(self):
+        '''The index labels of the error rows, once for each error (in ``errors`` order).'''
+        return list(self._error_rows().index)
+
+    def _error_rows(self):
+        if self._error_rows_cache is None:
+            self._error_rows_cache = self.source_df.take(self._error_positions[self._error_order])
+        return self._error_rows_cache
+
+    def _error_details(self):
+        if self._error_details_cache is not None:
+            return self._error_details_cache
+
+        row_by_error = np.empty(len(self._error_order), dtype=np.int64)
+        row_by_error[self._error_order] = np.arange(len(self._error_order))
+
+        details = [None] * len(row_by_error)
+        start = 0
+        for map_idx, (pd_map, errors) in enumerate(zip(self.maps, self._map_errors)):
+            rows = row_by_error[start:start + len(errors)]
+            start += len(errors)
+            if len(errors) == 0:
+                continue
+
+            args = self._map_error_args(map_idx, np.arange(len(errors)))
+            for row, arg, err, err_type in zip(rows, args, errors.exceptions, errors.types):
+                details[row] = {
+                    'msg': _error_message(err_type, arg, err),
+                    'err': err,
+                    'arg': arg,
+                    'sources': pd_map.sources,
+                    'targets': pd_map.targets,
+                    'transform': pd_map.transform
+                }
+
+        self._error_details_cache = details
+        return details
+
+    def _capture_error_args(self, map_indices):
+        '''
+        Keeps the arguments of the error rows of maps that have been evaluated inplace,
+        before their sources can be overwritten by the targets of the mapping.
+        '''
+
+        if not self.inplace:
             return
 
-        if self.on_error == 'raise':
-            for idx, err in self.errors.iterrows():
-                LOG.error('Mapping error at index %s: %s', idx, err['__error__'])
+        for map_idx in map_indices:
+            if map_idx not in self._captured_args:
+                positions = self._map_errors[map_idx].positions
+                self._captured_args[map_idx] = (
+                    self.maps[map_idx]._error_args(self.source_df, positions) if len(positions) > 0 else []
+                )
+
+    def _map_error_args(self, map_idx, indices):
+        '''Returns the arguments passed to the transform of a map for the errors at ``indices``.'''
+        if map_idx in self._captured_args:
+            args = self._captured_args[map_idx]
+            return [args[i] for i in indices]
+
+        positions = self._map_errors[map_idx].positions[indices]
+        return self.maps[map_idx]._error_args(self.source_df, positions)
+
+    def _handle_errors(self, aborted=False):
+        if self.error_count == 0:
+            return
+
+        if aborted or self.on_error == 'raise':
+            self._log_errors()
+
+            if aborted:
+                raise PdMappingError(
+                    'Aborting mapping after {} mapping errors exceeded max_errors={}. See log for details.'.format(
+                        self.error_count, self.max_errors
+                    ),
+                    mapper=self
+                )
 
             raise PdMappingError(
                 'Raising exception due to {} mapping errors. See log for details.'.format(
-                    len(self.errors)
-                )
+                    self.error_count
+                ),
+                mapper=self
             )
         elif self.on_error == 'redirect':
-            self.mapped.drop(self.idx_errors, inplace=True)
-            self.errors['__error__'].apply(lambda v: LOG.error(v))
+            self._log_errors()
+
+            # Rows are dropped by position, so rows sharing a label with an error are kept
+            if self.inplace:
+                # Dropping the errors also drops them from the source, so they are kept first
+                self._error_rows()
+                self._capture_error_args(range(len(self.maps)))
+
+                # Pandas can only drop rows inplace by label, so label the rows by position
+                index = self.mapped.index
+                self.mapped.index = pd.RangeIndex(len(index))
+                self.mapped.drop(np.flatnonzero(self._error_mask), inplace=True)
+                self.mapped.index = index[~self._error_mask]
+            else:
+                self.mapped = self.mapped[~self._error_mask]
         else:
             raise ValueError('unknown on_error supplied: {}'.format(self.on_error))
 
+    def _log_errors(self):
+        if self.log_errors is None:
+            return
+        elif self.log_errors == 'rows':
+            for idx, detail in zip(self.idx_errors, self._error_details()):
+                LOG.error('Mapping error at index %s: %s', idx, detail)
+        elif self.log_errors == 'summary':
+            for map_idx, pd_map, errors, err_type, message, group in self._error_groups():
+                LOG.error(
+                    '%s mapping errors from %s to %s: %s: %s',
+                    len(group), pd_map.sources, pd_map.targets, err_type, message
+                )
+
+                samples = group[:self.log_samples]
+                positions = errors.positions[samples]
+                for idx, arg, err in zip(
+                    self.source_df.index[positions],
+                    self._map_error_args(map_idx, samples),
+                    errors.exceptions[samples]
+                ):
+                    LOG.error('Mapping error at index %s: %s', idx, _error_message(err_type, arg, err))
+        else:
+            raise ValueError('unknown log_errors supplied: {}'.format(self.log_errors))
+
+
+
+    def _error_limit(self):
+        if self.max_errors is None:
+            return None
+        if isinstance(self.max_errors, float):
+            return int(self.max_errors * len(self.source_df))
+        return self.max_errors
+
+    def _check_error_limit(self):
+        error_limit = self._error_limit()
+        if error_limit is not None and self.error_count > error_limit:
+            raise _ErrorLimitExceeded()
+
+    def _apply_process(self):
+        n_shards = min(self.workers, len(self.source_df))
+        if n_shards <= 1:
+            return self._apply_stages()
+
+        bounds = np.linspace(0, len(self.source_df), n_shards + 1).astype(int)
+        shards = [self.source_df.iloc[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        with ProcessPoolExecutor(max_workers=n_shards) as executor:
+            results = list(executor.map(
+                _apply_maps_to_shard, shards, itertools.repeat(self.maps), itertools.repeat(self.inplace),
+                itertools.repeat(self._error_limit())
+            ))
+
+        mapped = pd.concat([shard_mapped for shard_mapped, _, _ in results])
+        if self.inplace:
+            self._add_columns({
+                target: mapped[target].array
+                for pd_map in self.maps for target in pd_map.targets
+            })
+        else:
+            self.mapped = mapped
+
+        self._map_errors = [
+            PdMapErrors.concat([shard_errors[map_idx] for _, shard_errors, _ in results], bounds[:-1])
+            for map_idx in range(len(self.maps))
+        ]
+        if self.inplace:
+            self._captured_args = {
+                map_idx: [arg for _, _, shard_args in results for arg in shard_args[map_idx]]
+                for map_idx in range(len(self.maps))
+            }
+        self._check_error_limit()
+
+    def _independent_stages(self):
+        if self._stages is None:
+            self._stages = _independent_stages(self.maps, self.inplace)
+        return self._stages
+
+    def _evaluate_group(self, group):
+        pd_maps = [self.maps[map_idx] for map_idx in group]
+        map_errors = [self._map_errors[map_idx] for map_idx in group]
+        applied = _evaluate_fused(pd_maps, self.source_df, map_errors)
+        return [pd_map._columns(map_applied) for pd_map, map_applied in zip(pd_maps, applied)]
+
+    def _apply_stages(self, executor=None):
+        '''
+        Evaluates the maps one stage at a time (serially, or concurrently if an ``executor``
+        is given) and adds the targets of each stage to ``mapped`` in a single batch.
+        '''
+
+        for stage in self._independent_stages():
+            # The maps of a stage (whether fused or concurrent) share what is left of the limit
+            error_limit = self._error_limit()
+            if error_limit is not None:
+                PdMapErrors._share_limit(
+                    [self._map_errors[map_idx] for group in stage for map_idx in group],
+                    error_limit - self.error_count
+                )
+
+            if executor is None:
+                group_columns = [self._evaluate_group(group) for group in stage]
+            else:
+                group_columns = list(executor.map(self._evaluate_group, stage))
+            self._check_error_limit()
+
+            # Fused maps are evaluated together, but their targets are added in map order
+            map_columns_by_idx = {
+                map_idx: map_columns
+                for group, columns in zip(stage, group_columns)
+                for map_idx, map_columns in zip(group, columns)
+            }
+
+            columns = {}
+            copied = set()
+            for map_idx, map_columns in sorted(map_columns_by_idx.items()):
+                columns.update(map_columns)
+                if self.maps[map_idx]._apply == self.maps[map_idx]._apply_copy:
+                    copied.update(map_columns)
+                else:
+                    copied.difference_update(map_columns)
 
+            self._capture_error_args(map_columns_by_idx)
+            self._add_columns(columns, copied)
+
+    def _add_columns(self, columns, copied=()):
+        '''
+        Adds columns to ``mapped`` as one batch.  A new mapped dataframe is built from all of
+        the columns at once, so that it is not fragmented into a separate block for every
+        column.  When mapping inplace, the new columns are added to the source with a single
+        assignment, but pandas still inserts them one at a time (and has no public way to
+        consolidate a dataframe inplace), so the source is left fragmented, and pandas may
+        warn about it when there are many new columns.  With pandas copy-on-write enabled, the
+        ``copied`` columns (straight copies of source columns) are added as views of the
+        source rather than being combined with the others, which would copy them.
+        '''
+
+        if len(columns) == 0:
+            return
+
+        shared = set(copied) if _copy_on_write() else set()
+        order = list(dict.fromkeys([*self.mapped.columns, *columns]))
+
+        computed = {target: values for target, values in columns.items() if target not in shared}
+        if not self.inplace and len(self.mapped.columns) == 0:
+            self.mapped = pd.DataFrame(computed, index=self.mapped.index)
+        elif len(computed) > 0:
+            for target in [target for target in computed if target in self.mapped.columns]:
+                self.mapped[target] = computed[target]
+
+            new = [target for target in computed if target not in self.mapped.columns]
+            if len(new) > 0:
+                self.mapped[new] = pd.DataFrame({target: computed[target] for target in new}, index=self.mapped.index)
+
+        for target in order:
+            if target not in shared:
+                continue
+            if target in self.mapped.columns:
+                self.mapped[target] = columns[target]
+            else:
+                self.mapped.insert(order.index(target), target, columns[target])
+
+    def _apply_thread(self):
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self._apply_stages(executor)
 
     def apply(self):
-        for pd_map in self.maps:
-            pd_map.apply(self.source_df, self.mapped)
+        try:
+            if self.executor is None:
+                self._apply_stages()
+            elif self.executor == 'process':
+                self._apply_process()
+            elif self.executor == 'thread':
+                self._apply_thread()
+            else:
+                raise ValueError('unknown executor supplied: {}'.format(self.executor))
+        except _ErrorLimitExceeded:
+            self._collect_errors()
+            self._handle_errors(aborted=True)
 
         self._collect_errors()
         self._handle_errors()
@@ -235,9 +1719,95 @@ class PdMapper:
         return self
 
 
+class MappingPlan:
+    def __init__(self, maps, columns=None, **kwargs):
+        '''
+        A list of maps compiled once, so that it can be applied cheaply to many dataframes.
+
+        The maps are built, and the order in which they are evaluated is worked out, when the
+        plan is created rather than every time it is applied.
+
+        Args:
+          maps (list): A list of tuples or ``PdMap``s that define the mapping (see ``PdMapper``).
+          columns (list): If given, the columns of the dataframes the plan will be applied
+                          to.  The sources of the maps are checked against these columns
+                          when the plan is created, raising ``MissingSourceFieldError`` if
+                          any are missing.
+          **kwargs: Any other ``PdMapper`` options (e.g., ``on_error``).
+        '''
+
+        self.maps = PdMapper._coerce_maps(maps, kwargs.get('na_action'))
+        self.options = kwargs
+        self.inplace = kwargs.get('inplace', False)
+        self.stages = _independent_stages(self.maps, self.inplace)
+        self.columns = None if columns is None else list(columns)
+
+        if self.columns is not None:
+            self._validate()
+
+    def _validate(self):
+        available = set(self.columns)
+        for pd_map in self.maps:
+            for source in pd_map.sources:
+                if source not in available:
+                    raise MissingSourceFieldError('"{}" field not in the source dataframe'.format(source))
+            if self.inplace:
+                available.update(pd_map.targets)
+
+    def apply(self, df):
+        '''Applies the plan to a dataframe, returning the ``PdMapper``.'''
+        return PdMapper(df, self, **self.options).apply()
+
+    def apply_many(self, dfs):
+        '''
+        Applies the plan to several dataframes at once.  Dataframes with the same columns
+        and dtypes are concatenated and mapped together, so the overhead of each map is only
+        paid once for the whole batch, and the result is split back into one
+        ``(mapped, errors)`` pair per dataframe.  Errors are handled (and ``max_errors``
+        is enforced) for the batch as a whole, so with ``on_error='raise'`` an error in
+        any dataframe raises for the batch.  When mapping inplace, the dataframes are
+        mapped one at a time.
+
+        Args:
+          dfs (iterable): The dataframes to map.
+
+        Returns:
+          list: A ``(mapped, errors)`` pair of dataframes for each dataframe.
+        '''
+
+        dfs = list(dfs)
+        if len(dfs) == 0:
+            return []
+
+        if self.inplace or not all(_same_schema(dfs[0], df) for df in dfs[1:]):
+            return [(mapper.mapped, mapper.errors) for mapper in map(self.apply, dfs)]
+
+        # The concatenated dataframe is private, so there is no need to copy it again
+        options = dict(self.options, copy=False)
+        mapper = PdMapper(pd.concat(dfs), self, **options).apply()
+
+        bounds = np.cumsum([0] + [len(df) for df in dfs])
+        keep = ~mapper._error_mask if mapper.on_error == 'redirect' else np.ones(bounds[-1], dtype=bool)
+        mapped_bounds = np.concatenate([[0], np.cumsum(keep)])[bounds]
+        error_bounds = np.searchsorted(mapper._error_positions[mapper._error_order], bounds)
+
+        mapped, errors = mapper.mapped, mapper.errors
+        return [
+            (
+                mapped.iloc[mapped_bounds[i]:mapped_bounds[i + 1]],
+                errors.iloc[error_bounds[i]:error_bounds[i + 1]]
+            )
+            for i in range(len(dfs))
+        ]
+
+def _same_schema(df, other):
+    return df.columns.equals(other.columns) and df.dtypes.equals(other.dtypes)
+
+
 # Monkeypatch Pandas for ease of use
-def mapping(self, maps, inplace=False, on_error='raise'):
-    return PdMapper(self, maps, inplace=inplace, on_error=on_error).apply()
+def mapping(self, maps, inplace=False, on_error='raise', **kwargs):
+    '''Maps the dataframe, accepting the same arguments as ``PdMapper``.'''
+    return PdMapper(self, maps, inplace=inplace, on_error=on_error, **kwargs).apply()
 
 pd.DataFrame.mapping = mapping
 pd.PdMap = PdMap
@@ -1,13 +1,35 @@
+import asyncio
+import decimal
+import warnings
 import pytest
 
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 
 from pandas.testing import assert_frame_equal
 
 import pandas_mapper
 
+from pandas_mapper import coercions
+from pandas_mapper.cache import TransformCache
+from pandas_mapper.pandas_mapper import MappingPlan
 from pandas_mapper.pandas_mapper import MissingSourceFieldError
 from pandas_mapper.pandas_mapper import PdMappingError
+from pandas_mapper.pandas_mapper import PdMapper
+from pandas_mapper.pandas_mapper import _copy_on_write
+
+def has_option(option):
+    try:
+        pd.get_option(option)
+        return True
+    except KeyError:
+        return False
+
+requires_copy_on_write = pytest.mark.skipif(
+    not has_option('mode.copy_on_write'), reason='copy-on-write needs pandas 1.5 or later'
+)
 
 def translate(val):
     if val == 1:
@@ -268,6 +290,16 @@ class TestBasic:
 
         assert_frame_equal(actual_df, expected_df)
 
+    def test_positional_options(self, df_translate_err):
+        '''
+        The inplace and on_error options can be given positionally
+        '''
+
+        mapper = df_translate_err.mapping([('num', 'translated', translate)], True, 'redirect')
+
+        assert mapper.mapped is df_translate_err
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'tres']
+
     def test_errors_redirected_w_redirect(self, df_translate_err):
         '''
         An error can be redirected to a separate dataframe
@@ -349,3 +381,2451 @@ class TestBasic:
 
         with pytest.raises(MissingSourceFieldError):
             df.mapping([('numero', 'translated', translate)])
+
+
+class TestVectorized:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 3],
+                'name': ['one', 'two', 'three'],
+                'num_name': ['1-one', '2-two', '3-three']
+            }
+        )
+
+    def test_one_to_one_map(self, df):
+        '''
+        A vectorized one-to-one transform receives the whole source series
+        '''
+
+        received = []
+        def double(series):
+            received.append(series)
+            return series * 2
+
+        mapper = df.mapping([('num', 'doubled', double, {'vectorized': True})])
+
+        actual_df = mapper.mapped
+        expected_df = pd.DataFrame({'doubled': [2, 4, 6]})
+
+        assert_frame_equal(actual_df, expected_df)
+        assert len(received) == 1
+        assert isinstance(received[0], pd.Series)
+
+    def test_many_to_one_map(self, df):
+        '''
+        A vectorized many-to-one transform receives a dataframe of the sources
+        '''
+
+        mapper = df.mapping([
+            pd.PdMap(
+                source=['name', 'num'],
+                target='concatenated',
+                transform=lambda sdf: sdf['name'] + '-' + sdf['num'].astype(str),
+                vectorized=True
+            )
+        ])
+
+        actual_df = mapper.mapped
+        expected_df = pd.DataFrame({'concatenated': ['one-1', 'two-2', 'three-3']})
+
+        assert_frame_equal(actual_df, expected_df)
+
+    def test_one_to_many_map(self, df):
+        '''
+        A vectorized transform with multiple targets returns a dataframe
+        '''
+
+        def split(sdf):
+            split_df = sdf['num_name'].str.split('-', expand=True)
+            return pd.DataFrame({'split_num': split_df[0], 'split_name': split_df[1]})
+
+        mapper = df.mapping([('num_name', ['split_name', 'split_num'], split, {'vectorized': True})])
+
+        actual_df = mapper.mapped
+        expected_df = pd.DataFrame({
+            'split_name': ['one', 'two', 'three'],
+            'split_num': ['1', '2', '3'],
+        })
+
+        assert_frame_equal(actual_df, expected_df)
+
+    def test_errors_redirected(self, df):
+        '''
+        When a vectorized transform raises, all of its rows are redirected
+        '''
+
+        def broken(series):
+            raise ValueError('broken')
+
+        mapper = df.mapping(
+            [('num', 'translated', translate), ('name', 'broken', broken, {'vectorized': True})],
+            on_error='redirect'
+        )
+
+        assert len(mapper.mapped) == 0
+        assert list(mapper.errors['num']) == [1, 2, 3]
+        assert [err['arg'] for err in mapper.errors['__error__']] == ['one', 'two', 'three']
+
+    def test_error_w_raise_mode(self, df):
+        '''
+        A failing vectorized transform raises in the default mode
+        '''
+
+        with pytest.raises(PdMappingError):
+            df.mapping([('num', 'broken', lambda series: series.str.upper(), {'vectorized': True})])
+
+    def test_bisect_isolates_errors(self):
+        '''
+        With bisect, only the rows that cause a vectorized transform to fail are errors
+        '''
+
+        df = pd.DataFrame({'num': list(range(10))})
+
+        calls = []
+        def checked_double(series):
+            calls.append(len(series))
+            if (series == 7).any():
+                raise ValueError('Unlucky number')
+            return series * 2
+
+        mapper = df.mapping(
+            [('num', 'doubled', checked_double, {'vectorized': True, 'bisect': True})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.mapped['doubled']) == [0, 2, 4, 6, 8, 10, 12, 16, 18]
+        assert list(mapper.errors.index) == [7]
+        assert mapper.errors['__error__'].iloc[0]['arg'] == 7
+        assert len(calls) < len(df)
+
+    def test_bisect_many_to_many(self, df):
+        '''
+        Bisection also works for multi-target vectorized transforms
+        '''
+
+        def split(sdf):
+            if (sdf['num'] == 2).any():
+                raise ValueError('No twos')
+            split_df = sdf['num_name'].str.split('-', expand=True)
+            return pd.DataFrame({'split_num': split_df[0], 'split_name': split_df[1]})
+
+        mapper = df.mapping(
+            [(['num', 'num_name'], ['split_name', 'split_num'], split, {'vectorized': True, 'bisect': True})],
+            on_error='redirect'
+        )
+
+        expected_df = pd.DataFrame(
+            {'split_name': ['one', 'three'], 'split_num': ['1', '3']},
+            index=[0, 2]
+        )
+        assert_frame_equal(mapper.mapped, expected_df)
+        assert list(mapper.errors.index) == [1]
+
+    def test_reordered_result(self, df):
+        '''
+        Results are aligned with the source rows by their index
+        '''
+
+        mapper = df.mapping([('num', 'doubled', lambda series: (series * 2).iloc[::-1], {'vectorized': True})])
+
+        assert list(mapper.mapped['doubled']) == [2, 4, 6]
+
+    @pytest.mark.parametrize('transform', [
+        lambda series: series.iloc[:2] * 2,
+        lambda series: series.reset_index(drop=True) * 2,
+        lambda series: pd.concat([series, series.iloc[:1]]) * 2
+    ])
+    def test_misaligned_result(self, df, transform):
+        '''
+        Results with missing, extra or relabeled rows are mapping errors, rather than missing values
+        '''
+
+        df.index = [10, 20, 30]
+        mapper = df.mapping([('num', 'doubled', transform, {'vectorized': True})], on_error='redirect')
+
+        assert len(mapper.mapped) == 0
+        assert list(mapper.errors.index) == [10, 20, 30]
+        assert mapper.errors['__error__'].iloc[0]['msg'].endswith('not indexed like its input')
+
+    def test_misaligned_result_bisect(self, df):
+        '''
+        With bisect, only the batches whose results are misaligned are errors
+        '''
+
+        def drop_twos(series):
+            return series[series != 2] * 2
+
+        mapper = df.mapping([('num', 'doubled', drop_twos, {'vectorized': True, 'bisect': True})], on_error='redirect')
+
+        assert list(mapper.mapped['doubled']) == [2, 6]
+        assert list(mapper.errors.index) == [1]
+
+    def test_misaligned_dataframe_result(self, df):
+        '''
+        Multi-target results with missing rows are mapping errors
+        '''
+
+        def split(sdf):
+            split_df = sdf['num_name'].str.split('-', expand=True)
+            return pd.DataFrame({'split_num': split_df[0], 'split_name': split_df[1]}).iloc[:1]
+
+        mapper = df.mapping(
+            [('num_name', ['split_name', 'split_num'], split, {'vectorized': True})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.errors.index) == [0, 1, 2]
+
+
+class TestMemoize:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 1, 3, 2, 4, 1, 4],
+                'code': ['a', 'b', 'a', 'a', 'b', 'b', 'a', 'b']
+            },
+            index=[10, 11, 12, 13, 14, 15, 16, 17]
+        )
+
+    @staticmethod
+    def counted(func, calls):
+        def _counted(arg):
+            calls.append(arg)
+            return func(arg)
+        return _counted
+
+    def test_one_to_one_map(self, df):
+        '''
+        A memoized transform is only called once per distinct value
+        '''
+
+        calls = []
+        mapper = df.mapping(
+            [('num', 'translated', self.counted(translate, calls), {'memoize': True})],
+            on_error='redirect'
+        )
+
+        expected_df = pd.DataFrame(
+            {'translated': ['uno', 'dos', 'uno', 'tres', 'dos', 'uno']},
+            index=[10, 11, 12, 13, 14, 16]
+        )
+        assert_frame_equal(mapper.mapped, expected_df)
+        assert sorted(calls) == [1, 2, 3, 4]
+
+    def test_errors_broadcast(self, df):
+        '''
+        An error on a distinct value is reported for every row carrying that value
+        '''
+
+        mapper = df.mapping(
+            [('num', 'translated', translate, {'memoize': True})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.errors.index) == [15, 17]
+        assert [err['arg'] for err in mapper.errors['__error__']] == [4, 4]
+
+    def test_many_to_one_map(self, df):
+        '''
+        Multi-source transforms are memoized on distinct combinations of the sources
+        '''
+
+        calls = []
+        mapper = df.mapping([
+            (['num', 'code'], 'num_code', self.counted(concatenate('-'), calls), {'memoize': True})
+        ])
+
+        expected_df = pd.DataFrame(
+            {'num_code': ['1-a', '2-b', '1-a', '3-a', '2-b', '4-b', '1-a', '4-b']},
+            index=df.index
+        )
+        assert_frame_equal(mapper.mapped, expected_df)
+        assert len(calls) == 4
+
+    def test_missing_values(self):
+        '''
+        Missing values are memoized as one distinct value
+        '''
+
+        calls = []
+        df = pd.DataFrame({'code': ['a', None, 'a', None]})
+        mapper = df.mapping([('code', 'is_missing', self.counted(pd.isna, calls), {'memoize': True})])
+
+        assert list(mapper.mapped['is_missing']) == [False, True, False, True]
+        assert len(calls) == 2
+
+    def test_equal_values_of_different_types(self):
+        '''
+        Values that compare equal but have different types are memoized separately
+        '''
+
+        calls = []
+        df = pd.DataFrame({'value': pd.Series([1, 1.0, True, None, np.nan, pd.NaT, 1.0, None], dtype=object)})
+        mapper = df.mapping([('value', 'text', self.counted(repr, calls), {'memoize': True})])
+
+        assert list(mapper.mapped['text']) == ['1', '1.0', 'True', 'None', 'nan', 'NaT', '1.0', 'None']
+        assert len(calls) == 6
+
+    def test_unhashable_values(self):
+        '''
+        Unhashable source values are transformed without memoizing
+        '''
+
+        calls = []
+        df = pd.DataFrame({'items': [[1, 2], [3], [1, 2]]})
+        mapper = df.mapping([('items', 'total', self.counted(sum, calls), {'memoize': True})])
+
+        assert list(mapper.mapped['total']) == [3, 3, 3]
+        assert len(calls) == 3
+
+
+class TestStream:
+
+    @pytest.fixture
+    def chunks(self):
+        return [
+            pd.DataFrame({'num': [1, 2]}, index=[0, 1]),
+            pd.DataFrame({'num': [4, 3]}, index=[2, 3]),
+            pd.DataFrame({'num': [1]}, index=[4])
+        ]
+
+    def test_stream_maps_each_chunk(self, chunks):
+        '''
+        Each chunk is mapped and yielded with its errors
+        '''
+
+        results = list(PdMapper.stream(iter(chunks), [('num', 'translated', translate)], on_error='redirect'))
+
+        assert len(results) == 3
+        assert_frame_equal(
+            pd.concat([mapped for mapped, errors in results]),
+            pd.DataFrame({'translated': ['uno', 'dos', 'tres', 'uno']}, index=[0, 1, 3, 4])
+        )
+        assert [list(errors.index) for mapped, errors in results] == [[], [2], []]
+
+    def test_stream_does_not_carry_errors_between_chunks(self, chunks):
+        '''
+        Errors from one chunk are not reported again for later chunks
+        '''
+
+        maps = [pd.PdMap(source='num', target='translated', transform=translate)]
+        results = list(PdMapper.stream(chunks, maps, on_error='redirect'))
+
+        assert len(results[2][1]) == 0
+        assert len(results[2][0]) == 1
+
+    def test_stream_raises_on_error(self, chunks):
+        '''
+        With on_error='raise', the stream stops at the first chunk with errors
+        '''
+
+        stream = PdMapper.stream(chunks, [('num', 'translated', translate)])
+
+        mapped, errors = next(stream)
+        assert list(mapped['translated']) == ['uno', 'dos']
+        with pytest.raises(PdMappingError):
+            next(stream)
+
+
+class TestProcessExecutor:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 3, 4, 3, 2, 1, 5, 1, 2],
+                'num_name': ['1-one', '2-two', '3-three', '4-four', '3-three',
+                             '2-two', '1-one', 'five', '1-one', '2-two']
+            },
+            index=[19, 18, 17, 16, 15, 14, 13, 12, 11, 10]
+        )
+
+    @pytest.fixture
+    def maps(self):
+        return [
+            ('num', 'translated', translate),
+            ('num_name', ['split_name', 'split_num'], deconcatenate),
+            ('num', 'num_copy')
+        ]
+
+    def test_same_as_serial(self, df, maps):
+        '''
+        Mapping in worker processes gives the same result as mapping serially
+        '''
+
+        serial = df.mapping(maps, on_error='redirect')
+        parallel = df.mapping(maps, on_error='redirect', executor='process', workers=3)
+
+        assert_frame_equal(parallel.mapped, serial.mapped)
+
+        compare_cols = ['num', 'num_name']
+        assert_frame_equal(parallel.errors[compare_cols], serial.errors[compare_cols])
+        assert [err['msg'] for err in parallel.errors['__error__']] == \
+            [err['msg'] for err in serial.errors['__error__']]
+
+    def test_inplace(self, df, maps):
+        '''
+        Mapping in worker processes can be done inplace
+        '''
+
+        expected_df = df.copy().mapping(maps, inplace=True, on_error='redirect').mapped
+        actual_df = df.mapping(maps, inplace=True, on_error='redirect', executor='process', workers=3).mapped
+
+        assert_frame_equal(actual_df, expected_df)
+
+    def test_error_w_raise_mode(self, df, maps):
+        '''
+        Errors found in worker processes are raised
+        '''
+
+        with pytest.raises(PdMappingError):
+            df.mapping(maps, executor='process', workers=3)
+
+    def test_unknown_executor(self, df, maps):
+        '''
+        An unknown executor is rejected
+        '''
+
+        with pytest.raises(ValueError):
+            df.mapping(maps, executor='quantum')
+
+
+class TestThreadExecutor:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 3, 4],
+                'name': ['one', 'two', 'three', 'four'],
+                'num_name': ['1-one', '2-two', '3-three', '4-four']
+            }
+        )
+
+    def test_same_as_serial(self, df):
+        '''
+        Evaluating maps in threads gives the same result as evaluating them serially
+        '''
+
+        maps = [
+            ('num', 'translated', translate),
+            (['name', 'num'], 'concatenated', concatenate('-')),
+            ('num_name', ['split_name', 'split_num'], deconcatenate),
+            (None, 'five', 5)
+        ]
+
+        serial = df.mapping(maps, on_error='redirect')
+        threaded = df.mapping(maps, on_error='redirect', executor='thread', workers=4)
+
+        assert_frame_equal(threaded.mapped, serial.mapped)
+        assert_frame_equal(threaded.errors[['num', 'name']], serial.errors[['num', 'name']])
+
+    def test_inplace_chaining(self, df):
+        '''
+        Maps that depend on the targets of earlier maps wait for them
+        '''
+
+        mapper = df.mapping(
+            [
+                ('name', 'upper', str.upper),
+                ('num', 'translated', translate),
+                ('translated', 'hola', 'Hola {}'.format)
+            ],
+            inplace=True,
+            on_error='redirect',
+            executor='thread'
+        )
+
+        assert list(mapper.mapped['hola']) == ['Hola uno', 'Hola dos', 'Hola tres']
+        assert list(mapper.mapped.columns) == ['num', 'name', 'num_name', 'upper', 'translated', 'hola']
+
+    def test_shared_map_errors_are_independent(self, df):
+        '''
+        The same map can be used by concurrent mappers without mixing up their errors
+        '''
+
+        pd_map = pd.PdMap(source='num', target='translated', transform=translate)
+        frames = [df, df.iloc[:3]]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            mappers = list(executor.map(
+                lambda frame: frame.mapping([pd_map], on_error='redirect', executor='thread'), frames
+            ))
+
+        assert [len(mapper.errors) for mapper in mappers] == [1, 0]
+
+
+class TestAsync:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 3, 4, 1, 2, 3, 1],
+                'name': ['one', 'two', 'three', 'four', 'one', 'two', 'three', 'one']
+            }
+        )
+
+    def test_one_to_one_map(self, df):
+        '''
+        Coroutine transforms run concurrently, up to max_concurrency
+        '''
+
+        running = []
+        max_running = []
+        async def slow_translate(val):
+            running.append(val)
+            max_running.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+            return translate(val)
+
+        mapper = df.mapping(
+            [pd.PdMap(source='num', target='translated', transform=slow_translate, max_concurrency=3)],
+            on_error='redirect'
+        )
+
+        expected_df = pd.DataFrame(
+            {'translated': ['uno', 'dos', 'tres', 'uno', 'dos', 'tres', 'uno']},
+            index=[0, 1, 2, 4, 5, 6, 7]
+        )
+        assert_frame_equal(mapper.mapped, expected_df)
+        assert max(max_running) == 3
+
+    def test_errors_redirected(self, df):
+        '''
+        Errors in coroutine transforms are redirected like any other mapping error
+        '''
+
+        async def async_translate(val):
+            await asyncio.sleep(0.01 * (5 - val))
+            return translate(val)
+
+        mapper = df.mapping([('num', 'translated', async_translate)], on_error='redirect')
+
+        assert list(mapper.errors.index) == [3]
+        assert mapper.errors['__error__'].iloc[0]['msg'] == 'ValueError(4): Unknown translation: 4'
+
+    def test_many_to_many_map(self, df):
+        '''
+        Multi-target coroutine transforms return a dict-like containing the targets
+        '''
+
+        async def describe(row):
+            return {'label': '{}-{}'.format(row['num'], row['name']), 'length': len(row['name'])}
+
+        mapper = df.iloc[:2].mapping([(['num', 'name'], ['label', 'length'], describe)])
+
+        expected_df = pd.DataFrame({'label': ['1-one', '2-two'], 'length': [3, 3]})
+        assert_frame_equal(mapper.mapped, expected_df)
+
+    def test_inside_running_event_loop(self, df):
+        '''
+        Coroutine transforms can be used from code that is already running an event loop
+        '''
+
+        async def async_upper(val):
+            return val.upper()
+
+        async def run_mapping():
+            return df.mapping([('name', 'upper', async_upper)])
+
+        loop = asyncio.new_event_loop()
+        try:
+            mapper = loop.run_until_complete(run_mapping())
+        finally:
+            loop.close()
+        assert list(mapper.mapped['upper']) == list(df['name'].str.upper())
+
+
+class TestErrorStore:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 4, 3, 5],
+                'name': ['one', 'four', 'three', 'five']
+            },
+            index=['a', 'b', 'c', 'd']
+        )
+
+    def test_errors_recorded_by_position(self, df):
+        '''
+        Map errors are recorded by row position, with the exception for each row
+        '''
+
+        pd_map = pd.PdMap(source='num', target='translated', transform=translate)
+        pd_map.apply(df, pd.DataFrame(index=df.index))
+
+        assert list(pd_map.errors.positions) == [1, 3]
+        assert list(pd_map.errors.types) == ['ValueError', 'ValueError']
+        assert list(pd_map.errors.messages) == ['Unknown translation: 4', 'Unknown translation: 5']
+
+    def test_batch_errors_share_exception(self, df):
+        '''
+        Rows that fail together in a vectorized transform share a single exception
+        '''
+
+        def broken(series):
+            raise ValueError('broken')
+
+        pd_map = pd.PdMap(source='num', target='broken', transform=broken, vectorized=True)
+        pd_map.apply(df, pd.DataFrame(index=df.index))
+
+        assert list(pd_map.errors.positions) == [0, 1, 2, 3]
+        assert len(set(id(err) for err in pd_map.errors.exceptions)) == 1
+
+    def test_errors_w_duplicate_index(self, df):
+        '''
+        Error records are taken by position, so duplicate index labels are not multiplied
+        '''
+
+        df.index = ['a', 'a', 'b', 'b']
+        mapper = df.mapping([('num', 'translated', translate)], on_error='redirect')
+
+        assert list(mapper.errors['num']) == [4, 5]
+        assert [err['arg'] for err in mapper.errors['__error__']] == [4, 5]
+
+    def test_rows_w_several_errors(self, df):
+        '''
+        A row that fails in several maps has one error record per map, listed in row order
+        '''
+
+        mapper = df.mapping(
+            [('num', 'translated', translate), ('name', 'num_again', lambda v: int(v))],
+            on_error='redirect'
+        )
+
+        assert list(mapper.errors.index) == ['a', 'b', 'b', 'c', 'd', 'd']
+        assert [err['targets'] for err in mapper.errors['__error__']][:3] == \
+            [['num_again'], ['translated'], ['num_again']]
+
+
+class TestLazyErrors:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 4, 3, 5],
+                'name': ['one', 'four', 'three', 'five']
+            }
+        )
+
+    def test_error_count(self, df):
+        '''
+        The number of errors is available without building the errors dataframe
+        '''
+
+        mapper = df.mapping(
+            [('num', 'translated', translate), ('name', 'num_again', lambda v: int(v))],
+            on_error='redirect'
+        )
+
+        assert mapper.error_count == 6
+        assert len(mapper.errors) == 6
+
+    def test_error_summary(self, df):
+        '''
+        Errors are summarized by map and exception type
+        '''
+
+        mapper = df.mapping(
+            [('num', 'translated', translate), ('name', 'num_again', lambda v: int(v))],
+            on_error='redirect'
+        )
+
+        expected_df = pd.DataFrame({
+            'sources': [['num'], ['name']],
+            'targets': [['translated'], ['num_again']],
+            'type': ['ValueError', 'ValueError'],
+            'message': ['Unknown translation: #', "invalid literal for int() with base #: '...'"],
+            'count': [2, 4]
+        })
+        assert_frame_equal(mapper.error_summary(), expected_df)
+
+    def test_no_errors(self, df):
+        '''
+        Without errors, the count is zero and the errors dataframe is empty
+        '''
+
+        mapper = df.iloc[[0, 2]].mapping([('num', 'translated', translate)], on_error='redirect')
+
+        assert mapper.error_count == 0
+        assert len(mapper.error_summary()) == 0
+        assert len(mapper.errors) == 0
+        assert '__error__' in mapper.errors
+
+    def test_errors_after_inplace_redirect(self, df):
+        '''
+        Error records are still available after they have been dropped from an inplace mapping
+        '''
+
+        mapper = df.mapping([('num', 'translated', translate)], inplace=True, on_error='redirect')
+
+        assert list(df['num']) == [1, 3]
+        assert list(mapper.errors['num']) == [4, 5]
+        assert [err['arg'] for err in mapper.errors['__error__']] == [4, 5]
+
+
+class TestMaxErrors:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({'num': [1, 4, 2, 5, 3, 6, 1, 2, 3, 1]})
+
+    @staticmethod
+    def counted(func, calls):
+        def _counted(arg):
+            calls.append(arg)
+            return func(arg)
+        return _counted
+
+    def test_fail_fast(self, df):
+        '''
+        With max_errors=0, mapping stops at the first error
+        '''
+
+        calls = []
+        with pytest.raises(PdMappingError) as excinfo:
+            df.mapping(
+                [('num', 'translated', self.counted(translate, calls)), ('num', 'copied')],
+                max_errors=0
+            )
+
+        assert calls == [1, 4]
+        assert excinfo.value.mapper.error_count == 1
+        assert list(excinfo.value.mapper.errors['num']) == [4]
+
+    def test_max_errors_count(self, df):
+        '''
+        Mapping stops as soon as there are more than max_errors errors
+        '''
+
+        calls = []
+        with pytest.raises(PdMappingError):
+            df.mapping([('num', 'translated', self.counted(translate, calls))], max_errors=2)
+
+        assert calls == [1, 4, 2, 5, 3, 6]
+
+    @pytest.mark.parametrize('options', [
+        {'memoize': True},
+        {'na_action': 'ignore'},
+        {'when': 'num > 0'},
+        {'when': 'num < 4', 'otherwise': translate}
+    ])
+    def test_fail_fast_wrapped_transforms(self, df, options):
+        '''
+        Mapping stops at the first error for transforms that are evaluated on a subset of the rows
+        '''
+
+        calls = []
+        counted = self.counted(translate, calls)
+        options = {option: counted if value is translate else value for option, value in options.items()}
+        with pytest.raises(PdMappingError) as excinfo:
+            df.mapping([('num', 'translated', counted, options)], max_errors=0)
+
+        assert [num for num in calls if num > 3] == [4]
+        assert list(excinfo.value.mapper.errors['num']) == [4]
+
+    def test_fail_fast_categories(self, df):
+        '''
+        Mapping stops at the first failing category
+        '''
+
+        calls = []
+        with pytest.raises(PdMappingError):
+            df.astype('category').mapping([('num', 'translated', self.counted(translate, calls))], max_errors=0)
+
+        assert calls == [1, 2, 3, 4]
+
+    def test_memoized_errors_count_rows(self, df):
+        '''
+        A failing distinct value counts as an error for each of its rows
+        '''
+
+        calls = []
+        df = pd.DataFrame({'num': [4] * 5 + [5, 6]})
+        with pytest.raises(PdMappingError) as excinfo:
+            df.mapping([('num', 'translated', self.counted(translate, calls), {'memoize': True})], max_errors=3)
+
+        assert calls == [4]
+        assert excinfo.value.mapper.error_count == 5
+
+    def test_fail_fast_cache(self, df, tmp_path):
+        '''
+        Mapping stops at the first error for cached transforms
+        '''
+
+        calls = []
+        cache = TransformCache(str(tmp_path / 'cache.db'))
+        with pytest.raises(PdMappingError):
+            df.mapping(
+                [('num', 'translated', self.counted(translate, calls), {'cache': cache, 'cache_key': 'translate'})],
+                max_errors=0
+            )
+
+        assert calls == [1, 4]
+
+    def test_max_errors_across_maps(self, df):
+        '''
+        The limit applies to the errors of all maps together
+        '''
+
+        calls = []
+        with pytest.raises(PdMappingError) as excinfo:
+            df.mapping(
+                [
+                    ('num', 'translated', translate),
+                    ('num', 'translated_again', self.counted(translate, calls))
+                ],
+                max_errors=3,
+                on_error='redirect'
+            )
+
+        assert calls == [1, 4]
+        assert excinfo.value.mapper.error_count == 4
+
+    def test_max_errors_fused_maps(self, df):
+        '''
+        Row-wise maps evaluated in the same pass over the rows share the limit
+        '''
+
+        df = df.assign(other=df['num'])
+        with pytest.raises(PdMappingError) as excinfo:
+            df.mapping(
+                [
+                    (['num', 'other'], 'translated_{}'.format(i), lambda row: translate(row['num']))
+                    for i in range(3)
+                ],
+                max_errors=3,
+                on_error='redirect'
+            )
+
+        assert excinfo.value.mapper.error_count == 4
+
+    def test_max_errors_fraction(self, df):
+        '''
+        A float max_errors is a fraction of the rows
+        '''
+
+        mapper = df.mapping([('num', 'translated', translate)], max_errors=0.3, on_error='redirect')
+        assert mapper.error_count == 3
+
+        with pytest.raises(PdMappingError):
+            df.mapping([('num', 'translated', translate)], max_errors=0.2, on_error='redirect')
+
+    def test_max_errors_vectorized(self, df):
+        '''
+        A failing vectorized batch counts all of its rows toward the limit
+        '''
+
+        def broken(series):
+            raise ValueError('broken')
+
+        with pytest.raises(PdMappingError) as excinfo:
+            df.mapping([('num', 'broken', broken, {'vectorized': True})], max_errors=5, on_error='redirect')
+
+        assert excinfo.value.mapper.error_count == 10
+
+    def test_max_errors_thread_executor(self, df):
+        '''
+        The limit is also enforced when maps are evaluated in threads
+        '''
+
+        with pytest.raises(PdMappingError):
+            df.mapping(
+                [('num', 'translated', translate), ('num', 'copied')],
+                max_errors=1,
+                on_error='redirect',
+                executor='thread'
+            )
+
+
+class TestErrorLogging:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({'num': [1, 4, 5, 6, 7, 8, 9, 2, 10]})
+
+    def test_summary_logging(self, df, caplog):
+        '''
+        By default, errors are logged as a count with a few example rows
+        '''
+
+        df.mapping([('num', 'translated', translate)], on_error='redirect', log_samples=2)
+
+        assert caplog.messages == [
+            "7 mapping errors from ['num'] to ['translated']: ValueError: Unknown translation: #",
+            'Mapping error at index 1: ValueError(4): Unknown translation: 4',
+            'Mapping error at index 2: ValueError(5): Unknown translation: 5',
+        ]
+
+    def test_summary_groups_by_message(self, caplog):
+        '''
+        Errors with different exception types or messages are logged separately
+        '''
+
+        df = pd.DataFrame({'val': ['1', 'x', '0', 'y']})
+        df.mapping([('val', 'inverse', lambda v: 1 / int(v))], on_error='redirect', log_samples=0)
+
+        assert caplog.messages == [
+            "2 mapping errors from ['val'] to ['inverse']: ValueError: invalid literal for int() with base #: '...'",
+            "1 mapping errors from ['val'] to ['inverse']: ZeroDivisionError: division by zero",
+        ]
+
+    def test_row_logging(self, df, caplog):
+        '''
+        Every error row can be logged individually
+        '''
+
+        with pytest.raises(PdMappingError):
+            df.mapping([('num', 'translated', translate)], log_errors='rows')
+
+        assert len(caplog.messages) == 7
+        assert caplog.messages[0].startswith("Mapping error at index 1: {'msg': 'ValueError(4)")
+
+    def test_no_logging(self, df, caplog):
+        '''
+        Logging errors can be disabled
+        '''
+
+        df.mapping([('num', 'translated', translate)], on_error='redirect', log_errors=None)
+        assert caplog.messages == []
+
+    @pytest.mark.parametrize('executor', [None, 'process'])
+    def test_inplace_overwritten_source(self, caplog, executor):
+        '''
+        Errors of a map that overwrites its own source (inplace) report the original values
+        '''
+
+        df = pd.DataFrame({'num': [1, 4, 2, 5]})
+        mapper = df.mapping(
+            [('num', 'num', translate)],
+            inplace=True, on_error='redirect', log_samples=1, executor=executor, workers=2
+        )
+
+        assert caplog.messages[1] == 'Mapping error at index 1: ValueError(4): Unknown translation: 4'
+        assert [detail['arg'] for detail in mapper.errors['__error__']] == [4, 5]
+        assert list(mapper.mapped['num']) == ['uno', 'dos']
+
+
+class TestColumnAssembly:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({'num': [1, 2, 3], 'name': ['one', 'two', 'three']}, index=[10, 20, 30])
+
+    @pytest.fixture
+    def many_maps(self):
+        return [('num', 'num_{}'.format(i), lambda v, i=i: v + i) for i in range(150)]
+
+    def test_many_targets_are_not_fragmented(self, df, many_maps):
+        '''
+        Mapping many targets builds the mapped dataframe without fragmenting it
+        '''
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', pd.errors.PerformanceWarning)
+            mapper = df.mapping(many_maps)
+            mapper.mapped.copy()
+
+        assert list(mapper.mapped.columns) == ['num_{}'.format(i) for i in range(150)]
+        assert list(mapper.mapped['num_149']) == [150, 151, 152]
+        assert list(mapper.mapped.index) == [10, 20, 30]
+
+    def test_many_targets_inplace(self, df, many_maps):
+        '''
+        Mapping many targets inplace adds them all to the source, which is left fragmented
+        (and pandas may warn about it)
+        '''
+
+        mapper = df.mapping(many_maps, inplace=True)
+
+        assert mapper.mapped is df
+        assert list(mapper.mapped.columns) == ['num', 'name'] + ['num_{}'.format(i) for i in range(150)]
+        assert list(mapper.mapped['num_0']) == [1, 2, 3]
+
+    def test_later_maps_overwrite_earlier_targets(self, df):
+        '''
+        When two maps write the same target, the later map wins and the column keeps its position
+        '''
+
+        mapper = df.mapping([
+            ('num', 'out', lambda v: v),
+            ('name', 'other', str.upper),
+            ('name', 'out', str.title)
+        ])
+
+        expected = pd.DataFrame(
+            {'out': ['One', 'Two', 'Three'], 'other': ['ONE', 'TWO', 'THREE']},
+            index=[10, 20, 30]
+        )
+        assert_frame_equal(mapper.mapped, expected)
+
+    def test_vectorized_result_is_aligned(self, df):
+        '''
+        A vectorized transform returning a series in a different order is aligned to the source
+        '''
+
+        mapper = df.mapping([
+            ('num', 'doubled', lambda s: (s * 2).iloc[::-1], {'vectorized': True}),
+            ('name', 'name', lambda v: v)
+        ])
+
+        expected = pd.DataFrame({'doubled': [2, 4, 6], 'name': ['one', 'two', 'three']}, index=[10, 20, 30])
+        assert_frame_equal(mapper.mapped, expected)
+
+
+class TestCopyOnWrite:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({'num': [1, 2, 3], 'name': ['one', 'two', 'three']})
+
+    @staticmethod
+    def fill_inplace(s):
+        with pd.option_context('mode.chained_assignment', None):
+            s.iloc[0] = 100
+        return s * 2
+
+    def test_transforms_cannot_modify_source(self, df):
+        '''
+        By default, a transform that modifies its input does not modify the source dataframe
+        '''
+
+        mapper = df.mapping([('num', 'doubled', self.fill_inplace, {'vectorized': True})])
+
+        assert list(mapper.mapped['doubled']) == [200, 4, 6]
+        assert list(df['num']) == [1, 2, 3]
+
+    def test_copied_columns_are_independent(self, df):
+        '''
+        Modifying a copied column in the mapped dataframe does not modify the source
+        '''
+
+        mapper = df.mapping([('num', 'number'), ('name', 'upper', str.upper)])
+        mapper.mapped.loc[0, 'number'] = 100
+
+        assert list(df['num']) == [1, 2, 3]
+        assert list(mapper.mapped.columns) == ['number', 'upper']
+
+    def test_no_copy_shares_source(self, df):
+        '''
+        With copy=False, the source data is shared rather than copied
+        '''
+
+        mapper = df.mapping([('num', 'number')], copy=False)
+
+        assert np.shares_memory(mapper.source_df['num'].values, df['num'].values)
+        assert list(mapper.mapped['number']) == [1, 2, 3]
+
+    @requires_copy_on_write
+    def test_copy_on_write_shares_copied_columns(self):
+        '''
+        With copy-on-write, copied columns are views of the source until they are written to
+        '''
+
+        with pd.option_context('mode.copy_on_write', True):
+            source = pd.DataFrame({'num': [1, 2, 3], 'name': ['one', 'two', 'three']})
+            mapper = source.mapping([
+                ('name', 'upper', str.upper),
+                ('num', 'number'),
+                ('num', 'doubled', lambda v: v * 2)
+            ])
+
+            assert np.shares_memory(mapper.mapped['number'].values, source['num'].values)
+            assert list(mapper.mapped.columns) == ['upper', 'number', 'doubled']
+
+            mapper.mapped.loc[0, 'number'] = 100
+            assert list(source['num']) == [1, 2, 3]
+            assert list(mapper.mapped['number']) == [100, 2, 3]
+
+    @requires_copy_on_write
+    def test_copy_on_write_inplace(self):
+        '''
+        With copy-on-write, copied columns added inplace keep the column order
+        '''
+
+        with pd.option_context('mode.copy_on_write', True):
+            source = pd.DataFrame({'num': [1, 2, 3], 'name': ['one', 'two', 'three']})
+            mapper = source.mapping([
+                ('num', 'number'),
+                ('name', 'upper', str.upper),
+                ('num', 'name')
+            ], inplace=True)
+
+            assert list(mapper.mapped.columns) == ['num', 'name', 'number', 'upper']
+            assert list(mapper.mapped['name']) == [1, 2, 3]
+            assert list(mapper.mapped['upper']) == ['ONE', 'TWO', 'THREE']
+
+    def test_copy_on_write_option_missing(self, df, monkeypatch):
+        '''
+        With pandas versions that do not have the copy-on-write option, sources are copied
+        '''
+
+        def get_option(option):
+            raise KeyError('No such keys(s): {!r}'.format(option))
+
+        monkeypatch.setattr(pd, '__version__', '1.1.0')
+        monkeypatch.setattr(pd, 'get_option', get_option)
+
+        assert _copy_on_write() is False
+        mapper = df.mapping([('num', 'number')])
+        assert not np.shares_memory(mapper.source_df['num'].values, df['num'].values)
+
+
+class TestMappingPlan:
+
+    @pytest.fixture
+    def maps(self):
+        return [
+            ('num', 'translated', translate),
+            (['name', 'num'], 'concatenated', concatenate('-')),
+            ('name', 'name')
+        ]
+
+    @pytest.fixture
+    def dfs(self):
+        return [
+            pd.DataFrame({'num': [1, 2], 'name': ['one', 'two']}),
+            pd.DataFrame({'num': [3, 4, 1], 'name': ['three', 'four', 'one']}),
+            pd.DataFrame({'num': [2], 'name': ['two']}, index=[5])
+        ]
+
+    def test_apply_same_as_mapping(self, maps, dfs):
+        '''
+        Applying a plan gives the same result as mapping the dataframe directly
+        '''
+
+        plan = MappingPlan(maps, on_error='redirect')
+
+        for df in dfs:
+            expected = df.mapping(maps, on_error='redirect')
+            actual = plan.apply(df)
+            assert_frame_equal(actual.mapped, expected.mapped)
+            assert_frame_equal(actual.errors[['num', 'name']], expected.errors[['num', 'name']])
+
+    def test_maps_are_compiled_once(self, maps, dfs):
+        '''
+        The maps of a plan are built once and reused every time it is applied
+        '''
+
+        plan = MappingPlan(maps)
+
+        assert plan.apply(dfs[0]).maps is plan.maps
+        assert plan.apply(dfs[2]).maps is plan.maps
+
+    def test_validates_columns(self, maps):
+        '''
+        A plan raises as soon as it is created if a source is not in the given columns
+        '''
+
+        with pytest.raises(MissingSourceFieldError):
+            MappingPlan(maps, columns=['num'])
+
+        MappingPlan(maps, columns=['num', 'name'])
+
+    def test_validates_inplace_targets(self):
+        '''
+        When mapping inplace, a map may use the targets of earlier maps as sources
+        '''
+
+        maps = [('num', 'translated', translate), ('translated', 'upper', str.upper)]
+
+        MappingPlan(maps, columns=['num'], inplace=True)
+        with pytest.raises(MissingSourceFieldError):
+            MappingPlan(maps, columns=['num'])
+
+    def test_apply_many_same_as_apply(self, maps, dfs):
+        '''
+        Applying a plan to a batch of dataframes gives the same results as applying it to each one
+        '''
+
+        plan = MappingPlan(maps, on_error='redirect')
+        results = plan.apply_many(dfs)
+
+        assert len(results) == len(dfs)
+        for df, (mapped, errors) in zip(dfs, results):
+            expected = plan.apply(df)
+            assert_frame_equal(mapped, expected.mapped)
+            assert_frame_equal(errors[['num', 'name']], expected.errors[['num', 'name']])
+
+    def test_apply_many_keeps_rows_with_duplicate_labels(self, maps, dfs):
+        '''
+        A row is not dropped because a row in another dataframe with the same label has an error
+        '''
+
+        plan = MappingPlan(maps, on_error='redirect')
+        (first, _), (second, errors), _ = plan.apply_many(dfs)
+
+        assert list(first['translated']) == ['uno', 'dos']
+        assert list(second.index) == [0, 2]
+        assert list(errors.index) == [1]
+
+    def test_apply_many_mixed_schemas(self, maps, dfs):
+        '''
+        Dataframes with different columns are mapped separately
+        '''
+
+        other = pd.DataFrame({'num': [3], 'name': ['three'], 'extra': [True]})
+        results = MappingPlan(maps, on_error='redirect').apply_many([dfs[0], other])
+
+        assert list(results[0][0]['translated']) == ['uno', 'dos']
+        assert list(results[1][0]['concatenated']) == ['three-3']
+
+    def test_apply_many_raises_for_batch(self, maps, dfs):
+        '''
+        With on_error='raise', an error in any dataframe raises for the batch
+        '''
+
+        with pytest.raises(PdMappingError):
+            MappingPlan(maps).apply_many(dfs)
+
+        assert MappingPlan(maps).apply_many([]) == []
+
+
+class TestFusedMaps:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 3, 4],
+                'name': ['one', 'two', 'three', 'four'],
+                'num_name': ['1-one', '2-two', '3-three', '4-four']
+            }
+        )
+
+    def test_maps_with_same_sources_share_a_pass(self, df):
+        '''
+        Row-wise maps with the same sources are evaluated together, one row at a time
+        '''
+
+        calls = []
+
+        def record(label):
+            def _record(row):
+                calls.append((label, row.name))
+                return row['num']
+            return _record
+
+        df.mapping([
+            (['num', 'name'], 'first', record('first')),
+            (['num', 'name'], 'second', record('second'))
+        ])
+
+        assert calls[:4] == [('first', 0), ('second', 0), ('first', 1), ('second', 1)]
+
+    def test_errors_are_attributed_to_each_map(self, df):
+        '''
+        Errors raised in a fused pass are attributed to the map that raised them
+        '''
+
+        def fail_on(num):
+            def _fail_on(row):
+                if row['num'] == num:
+                    raise ValueError('Bad num: {}'.format(num))
+                return row['name']
+            return _fail_on
+
+        mapper = df.mapping(
+            [
+                (['num', 'name'], 'first', fail_on(2)),
+                (['num', 'name'], 'second', fail_on(3))
+            ],
+            on_error='redirect'
+        )
+
+        summary = mapper.error_summary()
+        assert list(summary['targets']) == [['first'], ['second']]
+        assert list(mapper.errors['num']) == [2, 3]
+        assert list(mapper.mapped['first']) == ['one', 'four']
+
+    def test_maps_do_not_see_each_others_changes(self, df):
+        '''
+        A map that modifies its row does not change the row given to the other fused maps
+        '''
+
+        mapper = df.mapping([
+            ('num_name', ['split_name', 'split_num'], deconcatenate),
+            ('num_name', ['other_name', 'other_num'], lambda row: {
+                'other_name': len(row), 'other_num': row['num_name']
+            })
+        ])
+
+        assert list(mapper.mapped['split_name']) == ['one', 'two', 'three', 'four']
+        assert list(mapper.mapped['other_name']) == [1, 1, 1, 1]
+
+    def test_target_order_is_kept(self, df):
+        '''
+        The targets of fused maps are added in the order the maps were given
+        '''
+
+        mapper = df.mapping([
+            (['num', 'name'], 'first', concatenate('-')),
+            ('num', 'translated', translate),
+            (['num', 'name'], 'first', concatenate('+')),
+            (['num', 'name'], 'last', concatenate('/'))
+        ], on_error='redirect')
+
+        assert list(mapper.mapped.columns) == ['first', 'translated', 'last']
+        assert list(mapper.mapped['first']) == ['1+one', '2+two', '3+three']
+
+    def test_same_with_thread_executor(self, df):
+        '''
+        Fused maps give the same result when evaluated in threads
+        '''
+
+        maps = [
+            (['num', 'name'], 'first', concatenate('-')),
+            (['name', 'num'], 'second', concatenate('-')),
+            (['num', 'name'], 'third', concatenate('+'))
+        ]
+
+        assert_frame_equal(df.mapping(maps, executor='thread').mapped, df.mapping(maps).mapped)
+
+
+class TestRowType:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': [1, 2, 3, 4],
+                'name': ['one', 'two', 'three', 'four'],
+                'num_name': ['1-one', '2-two', '3-three', '4-four']
+            }
+        )
+
+    def test_dict_rows(self, df):
+        '''
+        With row_type='dict', the transform receives a dict of the source values
+        '''
+
+        rows = []
+        mapper = df.mapping([
+            (['name', 'num'], 'concatenated', lambda row: rows.append(row) or '{name}-{num}'.format(**row),
+             {'row_type': 'dict'})
+        ])
+
+        assert rows[0] == {'name': 'one', 'num': 1}
+        assert list(mapper.mapped['concatenated']) == ['one-1', 'two-2', 'three-3', 'four-4']
+
+    def test_namedtuple_rows(self, df):
+        '''
+        With row_type='namedtuple', the transform receives a namedtuple of the source values
+        '''
+
+        mapper = df.mapping([
+            (['name', 'num'], 'concatenated', lambda row: '{}-{}'.format(row.name, row.num),
+             {'row_type': 'namedtuple'})
+        ])
+
+        assert list(mapper.mapped['concatenated']) == ['one-1', 'two-2', 'three-3', 'four-4']
+
+    def test_many_to_many_tuple_result(self, df):
+        '''
+        A multi-target transform may return a tuple of the target values
+        '''
+
+        mapper = df.mapping([
+            ('num_name', ['split_num', 'split_name'], lambda row: tuple(row['num_name'].split('-')),
+             {'row_type': 'dict'}),
+            (['num', 'name'], ['upper', 'double'], lambda row: (row.name.upper(), row.num * 2),
+             {'row_type': 'namedtuple'})
+        ])
+
+        assert list(mapper.mapped['split_num']) == ['1', '2', '3', '4']
+        assert list(mapper.mapped['split_name']) == ['one', 'two', 'three', 'four']
+        assert list(mapper.mapped['upper']) == ['ONE', 'TWO', 'THREE', 'FOUR']
+        assert list(mapper.mapped['double']) == [2, 4, 6, 8]
+
+    def test_wrong_number_of_target_values(self, df):
+        '''
+        A tuple result with the wrong number of target values is a mapping error
+        '''
+
+        mapper = df.mapping(
+            [('num_name', ['split_num', 'split_name'], lambda row: ('1', 'one', 'extra'), {'row_type': 'dict'})],
+            on_error='redirect'
+        )
+
+        assert len(mapper.mapped) == 0
+        assert mapper.error_summary()['type'][0] == 'ValueError'
+
+    def test_errors_keep_row_type(self, df):
+        '''
+        The arguments recorded for failing rows are rows of the same type given to the transform
+        '''
+
+        def fail_on_three(row):
+            if row['num'] == 3:
+                raise ValueError('Bad row')
+            return row['name']
+
+        mapper = df.mapping(
+            [(['num', 'name'], 'name', fail_on_three, {'row_type': 'dict'})],
+            on_error='redirect'
+        )
+
+        assert mapper.errors['__error__'].iloc[0]['arg'] == {'num': 3, 'name': 'three'}
+
+    def test_fused_dict_rows_are_independent(self, df):
+        '''
+        Fused maps are each given their own dict, so changes made by one are not seen by the other
+        '''
+
+        def pop_num(row):
+            return row.pop('num')
+
+        mapper = df.mapping([
+            (['num', 'name'], 'popped', pop_num, {'row_type': 'dict'}),
+            (['num', 'name'], 'again', pop_num, {'row_type': 'dict'})
+        ])
+
+        assert list(mapper.mapped['popped']) == [1, 2, 3, 4]
+        assert list(mapper.mapped['again']) == [1, 2, 3, 4]
+
+    def test_unknown_row_type(self):
+        '''
+        An unknown row_type raises a ValueError
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source=['num', 'name'], target='out', transform=str, row_type='list')
+
+
+class TestDtype:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({'num': [1, 2, 3, 4], 'name': ['one', 'two', 'three', 'four']})
+
+    @staticmethod
+    def double_small(val):
+        if val > 3:
+            raise ValueError('Too big: {}'.format(val))
+        return val * 2
+
+    def test_typed_target_with_errors(self, df):
+        '''
+        A typed target is not left as objects when some rows have errors
+        '''
+
+        untyped = df.mapping([('num', 'doubled', self.double_small)], on_error='redirect')
+        typed = df.mapping([('num', 'doubled', self.double_small, {'dtype': 'int64'})], on_error='redirect')
+
+        assert untyped.mapped['doubled'].dtype == object
+        assert typed.mapped['doubled'].dtype == 'int64'
+        assert list(typed.mapped['doubled']) == [2, 4, 6]
+        assert list(typed.errors['num']) == [4]
+
+    def test_dtypes_by_target(self, df):
+        '''
+        A dict of dtypes sets the dtype of each target, leaving the others inferred
+        '''
+
+        mapper = df.mapping([
+            (['num', 'name'], ['half', 'length', 'upper'],
+             lambda row: (row['num'] / 2, len(row['name']), row['name'].upper()),
+             {'row_type': 'dict', 'dtype': {'half': 'float32', 'length': 'int8'}})
+        ])
+
+        assert mapper.mapped.dtypes.to_dict() == {'half': 'float32', 'length': 'int8', 'upper': object}
+        assert list(mapper.mapped['length']) == [3, 3, 5, 4]
+
+    def test_nullable_dtype(self, df):
+        '''
+        Missing results are kept as missing values with a nullable dtype
+        '''
+
+        mapper = df.mapping([('num', 'even', lambda v: v if v % 2 == 0 else None, {'dtype': 'Int64'})])
+
+        assert mapper.mapped['even'].dtype == 'Int64'
+        assert mapper.mapped['even'].isna().tolist() == [True, False, True, False]
+
+    def test_unconvertible_values_are_errors(self, df):
+        '''
+        Rows whose result cannot be converted to the dtype are mapping errors
+        '''
+
+        mapper = df.mapping(
+            [('name', 'number', {'one': '1', 'two': '2', 'three': 'three', 'four': '4'}.get, {'dtype': 'int64'})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.mapped['number']) == [1, 2, 4]
+        assert mapper.mapped['number'].dtype == 'int64'
+        assert list(mapper.errors['name']) == ['three']
+        assert mapper.error_summary()['type'][0] == 'ValueError'
+
+    @pytest.mark.parametrize('vectorized', [False, True])
+    def test_lossy_integer_conversions_are_errors(self, df, vectorized):
+        '''
+        Results that would be truncated or wrapped by a numpy integer dtype are mapping errors
+        '''
+
+        mapper = df.mapping([
+            ('num', 'half', lambda v: v / 2, {'dtype': 'int64', 'vectorized': vectorized}),
+            ('num', 'large', lambda v: v * 50, {'dtype': 'int8', 'vectorized': vectorized})
+        ], on_error='redirect')
+
+        assert list(mapper.mapped['half']) == [1]
+        assert mapper.mapped['half'].dtype == 'int64'
+        assert list(mapper.errors['num']) == [1, 3, 3, 4]
+
+    def test_vectorized_dtype(self, df):
+        '''
+        The results of vectorized transforms are converted to the dtype too
+        '''
+
+        mapper = df.mapping([('num', 'halved', lambda s: s / 2, {'vectorized': True, 'dtype': 'float32'})])
+
+        assert mapper.mapped['halved'].dtype == 'float32'
+        assert list(mapper.mapped['halved']) == [0.5, 1.0, 1.5, 2.0]
+
+    def test_fused_maps_dtype(self, df):
+        '''
+        The results of row-wise maps with the same sources are converted to their dtypes
+        '''
+
+        mapper = df.mapping([
+            (['num', 'name'], 'length', lambda row: len(row['name']), {'dtype': 'int8'}),
+            (['num', 'name'], 'half', lambda row: row['num'] / 2, {'dtype': 'float32'}),
+            (['num', 'name'], 'code', lambda row: 'zz' if row['num'] == 3 else row['num'], {'dtype': 'int64'})
+        ], on_error='redirect')
+
+        assert mapper.mapped.dtypes.to_dict() == {'length': 'int8', 'half': 'float32', 'code': 'int64'}
+        assert list(mapper.mapped['code']) == [1, 2, 4]
+        assert list(mapper.errors['num']) == [3]
+
+    def test_empty_dataframe(self, df):
+        '''
+        Typed targets of an empty dataframe have the dtype
+        '''
+
+        mapper = df.iloc[:0].mapping([('num', 'doubled', self.double_small, {'dtype': 'int16'})])
+
+        assert mapper.mapped['doubled'].dtype == 'int16'
+
+    def test_unknown_target(self):
+        '''
+        A dtype for a target the map does not have raises a ValueError
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source='num', target='doubled', transform=self.double_small, dtype={'tripled': 'int64'})
+
+
+class TestLookup:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({'num': [1, 2, 3, 4], 'name': ['one', 'two', 'three', 'four']})
+
+    def test_dict_lookup(self, df):
+        '''
+        A dict transform looks up the source values, and unmatched keys are mapping errors
+        '''
+
+        mapper = df.mapping([('num', 'translated', {1: 'uno', 2: 'dos', 3: 'tres'})], on_error='redirect')
+
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'tres']
+        assert list(mapper.errors['num']) == [4]
+        assert mapper.error_summary()['type'][0] == 'KeyError'
+
+    def test_default(self, df):
+        '''
+        Unmatched keys get the default value, if one is given
+        '''
+
+        mapper = df.mapping([('num', 'translated', {1: 'uno', 2: 'dos'}, {'default': 'otro'})])
+
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'otro', 'otro']
+        assert mapper.error_count == 0
+
+    def test_series_lookup_keeps_dtype(self, df):
+        '''
+        A series lookup keeps the dtype of the series
+        '''
+
+        lookup = pd.Series([10, 20, 30, 40], index=['one', 'two', 'three', 'four'], dtype='int32')
+        mapper = df.mapping([('name', 'tens', lookup)])
+
+        assert list(mapper.mapped['tens']) == [10, 20, 30, 40]
+        assert mapper.mapped['tens'].dtype == 'int32'
+
+    def test_multi_column_keys(self, df):
+        '''
+        With multiple sources, the keys of a dict lookup are tuples of the source values
+        '''
+
+        mapper = df.mapping(
+            [(['num', 'name'], 'checked', {(1, 'one'): True, (2, 'two'): True, (3, 'tres'): True})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.mapped.index) == [0, 1]
+        assert list(mapper.errors['name']) == ['three', 'four']
+
+    def test_dataframe_lookup(self, df):
+        '''
+        A dataframe lookup provides the value of each target from the column of the same name
+        '''
+
+        lookup = pd.DataFrame(
+            {
+                'num': [1, 2, 3, 4],
+                'name': ['one', 'two', 'three', 'four'],
+                'spanish': ['uno', 'dos', 'tres', 'cuatro'],
+                'roman': ['I', 'II', 'III', 'IV']
+            }
+        ).set_index(['num', 'name'])
+
+        mapper = df.mapping([(['num', 'name'], ['roman', 'spanish'], lookup)])
+
+        assert list(mapper.mapped.columns) == ['roman', 'spanish']
+        assert list(mapper.mapped['roman']) == ['I', 'II', 'III', 'IV']
+        assert list(mapper.mapped['spanish']) == ['uno', 'dos', 'tres', 'cuatro']
+
+    def test_invalid_lookups(self):
+        '''
+        Lookups with duplicate keys, or keys that do not match the sources, raise a ValueError
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source='num', target='translated', transform=pd.Series(['uno', 'one'], index=[1, 1]))
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source=['num', 'name'], target='translated', transform={1: 'uno'})
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source='num', target=['a', 'b'], transform=pd.DataFrame({'a': [1]}))
+
+
+class TestExpression:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'price': [1.0, 2.0, 3.0, 4.0],
+                'qty': [1, 2, 0, 3],
+                'discount': [0.5, 0.0, 0.0, 1.0],
+                'name': ['one', 'two', 'three', 'four']
+            }
+        )
+
+    def test_arithmetic(self, df):
+        '''
+        An expression string is evaluated over the source columns
+        '''
+
+        mapper = df.mapping([(['price', 'qty', 'discount'], 'total', 'price * qty - discount')])
+
+        assert list(mapper.mapped['total']) == [0.5, 4.0, 0.0, 11.0]
+
+    def test_boolean(self, df):
+        '''
+        Boolean expressions, including comparisons with strings, give boolean targets
+        '''
+
+        mapper = df.mapping([
+            (['price', 'qty'], 'bulk', 'price > 1 and qty > 1'),
+            ('name', 'is_two', 'name == "two"')
+        ])
+
+        assert list(mapper.mapped['bulk']) == [False, True, False, True]
+        assert list(mapper.mapped['is_two']) == [False, True, False, False]
+
+    def test_only_sources_can_be_used(self):
+        '''
+        An expression that uses columns that are not sources, or is invalid, raises a ValueError
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source='price', target='total', transform='price * qty')
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source='price', target='total', transform='price *')
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source='price', target='total', transform='total = price * 2')
+
+    def test_check_finite(self, df):
+        '''
+        With check_finite=True, rows that evaluate to NaN or infinity are mapping errors
+        '''
+
+        df.loc[0, 'price'] = None
+        maps = [(['price', 'qty'], 'unit_price', 'price / qty', {'check_finite': True})]
+
+        mapper = df.mapping(maps, on_error='redirect')
+
+        assert list(mapper.mapped['unit_price']) == [1.0, 4.0 / 3]
+        assert list(mapper.errors['name']) == ['one', 'three']
+        assert set(mapper.error_summary()['message']) == {
+            'expression result is not finite: nan', 'expression result is not finite: inf'
+        }
+
+        unchecked = df.mapping([(['price', 'qty'], 'unit_price', 'price / qty')])
+        assert unchecked.error_count == 0
+
+    def test_evaluation_errors(self, df):
+        '''
+        If an expression fails for the data, all of the rows are mapping errors
+        '''
+
+        mapper = df.mapping([('name', 'bad', 'name - 1')], on_error='redirect')
+
+        assert len(mapper.mapped) == 0
+        assert mapper.error_count == 4
+
+
+class TestCoercions:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'num': ['1', ' 2.5', 'x', None, '4'],
+                'date': ['2020-01-01', '2020/01/02', '2020-02-30', None, '2021-12-31'],
+                'flag': ['Yes', 'no', 'maybe', None, '1'],
+                'text': ['  Abc ', 'd', None, 'E ', 'f']
+            }
+        )
+
+    def test_numeric(self, df):
+        '''
+        Values that are not numbers are mapping errors, but nulls are not
+        '''
+
+        mapper = df.mapping([('num', 'num', coercions.to_numeric())], on_error='redirect')
+
+        assert mapper.mapped['num'].tolist()[:2] == [1.0, 2.5]
+        assert mapper.mapped['num'].isna().tolist() == [False, False, True, False]
+        assert list(mapper.errors['num']) == ['x']
+        assert mapper.error_summary()['message'][0] == "cannot convert '...' to a number"
+
+    def test_clean_numeric_strings(self):
+        '''
+        Columns of valid number strings are converted to integers or floats
+        '''
+
+        df = pd.DataFrame({'ints': ['1', '22', '-3'], 'floats': ['1', '2.5', '1e3']})
+        mapper = df.mapping([
+            ('ints', 'ints', coercions.to_numeric()),
+            ('floats', 'floats', coercions.to_numeric(downcast='float'))
+        ])
+
+        assert mapper.mapped['ints'].dtype == 'int64'
+        assert mapper.mapped['floats'].dtype == 'float32'
+        assert list(mapper.mapped['floats']) == [1.0, 2.5, 1000.0]
+
+    def test_integer(self, df):
+        '''
+        Numbers with a fractional part cannot be converted to integers
+        '''
+
+        mapper = df.mapping([('num', 'num', coercions.to_integer())], on_error='redirect')
+
+        assert mapper.mapped['num'].dtype == 'Int64'
+        assert mapper.mapped['num'].tolist() == [1, pd.NA, 4]
+        assert list(mapper.errors['num']) == [' 2.5', 'x']
+
+    def test_python_literals_consistent(self):
+        '''
+        Python number literals that are not numbers to pandas are errors, whether or not
+        the rest of the column is valid
+        '''
+
+        clean = pd.DataFrame({'num': ['1_000', '2']}).mapping(
+            [('num', 'num', coercions.to_numeric())], on_error='redirect'
+        )
+        dirty = pd.DataFrame({'num': ['1_000', '2', 'x']}).mapping(
+            [('num', 'num', coercions.to_numeric())], on_error='redirect'
+        )
+
+        assert list(clean.errors['num']) == ['1_000']
+        assert list(dirty.errors['num']) == ['1_000', 'x']
+
+    def test_large_integers_exact(self):
+        '''
+        Integers are converted exactly, even if other values in the column are invalid
+        '''
+
+        df = pd.DataFrame({'num': ['9007199254740993', 'x', '9007199254740993.0', '3.0000000000000001', '1e3']})
+        mapper = df.mapping([('num', 'num', coercions.to_integer())], on_error='redirect')
+
+        assert mapper.mapped['num'].tolist() == [9007199254740993, 9007199254740993, 1000]
+        assert list(mapper.errors['num']) == ['x', '3.0000000000000001']
+
+    def test_integer_out_of_range(self):
+        '''
+        Integers that do not fit in the dtype cannot be converted
+        '''
+
+        df = pd.DataFrame({'num': ['1', '300', '99999999999999999999']})
+        mapper = df.mapping([('num', 'num', coercions.to_integer(dtype='Int16'))], on_error='redirect')
+
+        assert mapper.mapped['num'].tolist() == [1, 300]
+        assert list(mapper.errors['num']) == ['99999999999999999999']
+
+    def test_integer_needs_nullable_dtype(self):
+        '''
+        Integers can only be converted to a nullable dtype, which holds the values that cannot be converted
+        '''
+
+        with pytest.raises(ValueError):
+            coercions.to_integer(dtype='int64')
+
+    def test_datetime_with_format(self, df):
+        '''
+        Values that do not match the format, or are not valid dates, are mapping errors
+        '''
+
+        mapper = df.mapping([('date', 'date', coercions.to_datetime(format='%Y-%m-%d'))], on_error='redirect')
+
+        assert list(mapper.mapped['date'].dropna()) == [pd.Timestamp('2020-01-01'), pd.Timestamp('2021-12-31')]
+        assert list(mapper.errors['date']) == ['2020/01/02', '2020-02-30']
+        assert mapper.errors['__error__'].iloc[0]['msg'].endswith(
+            "cannot convert '2020/01/02' to a datetime with format '%Y-%m-%d'"
+        )
+
+    def test_boolean(self, df):
+        '''
+        Booleans are recognized from their text, ignoring case and whitespace
+        '''
+
+        mapper = df.mapping([('flag', 'flag', coercions.to_boolean())], on_error='redirect')
+
+        assert mapper.mapped['flag'].dtype == 'boolean'
+        assert mapper.mapped['flag'].tolist() == [True, False, pd.NA, True]
+        assert list(mapper.errors['flag']) == ['maybe']
+
+    def test_decimal(self, df):
+        '''
+        Decimals are exact, and can be rounded to a number of places
+        '''
+
+        mapper = df.mapping([('num', 'num', coercions.to_decimal(places=2))], on_error='redirect')
+
+        assert mapper.mapped['num'].tolist() == [decimal.Decimal('1.00'), decimal.Decimal('2.50'), None, decimal.Decimal('4.00')]
+        assert list(mapper.errors['num']) == ['x']
+
+    def test_decimal_too_large_to_round(self):
+        '''
+        Decimals with too many digits to be rounded to the places cannot be converted
+        '''
+
+        df = pd.DataFrame({'num': ['1.005', '1e30']})
+        mapper = df.mapping([('num', 'num', coercions.to_decimal(places=2))], on_error='redirect')
+
+        assert mapper.mapped['num'].tolist() == [decimal.Decimal('1.00')]
+        assert list(mapper.errors['num']) == ['1e30']
+
+    def test_failing_coercion(self):
+        '''
+        A coercion that raises makes every row a mapping error
+        '''
+
+        def broken(values):
+            raise ValueError('broken')
+
+        df = pd.DataFrame({'num': ['1', '2']})
+        mapper = df.mapping([('num', 'num', coercions.Coercion(broken, 'a number'))], on_error='redirect')
+
+        assert len(mapper.mapped) == 0
+        assert mapper.error_summary()['count'].tolist() == [2]
+
+    def test_string(self, df):
+        '''
+        Strings are trimmed and their case changed, keeping nulls
+        '''
+
+        mapper = df.mapping([('text', 'text', coercions.to_string(case='lower'))])
+
+        assert mapper.mapped['text'].tolist() == ['abc', 'd', pd.NA, 'e', 'f']
+        assert mapper.error_count == 0
+
+    def test_single_source_and_target(self):
+        '''
+        A coercion with several sources raises a ValueError
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap(source=['num', 'date'], target='num', transform=coercions.to_numeric())
+
+
+class TestPositionalErrors:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {'num': [1, 4, 2, 5], 'name': ['one', 'four', 'two', 'five']},
+            index=['a', 'b', 'a', 'b']
+        )
+
+    def test_duplicate_labels(self, df):
+        '''
+        Only the error rows are dropped, even if other rows have the same label
+        '''
+
+        mapper = df.mapping([('num', 'translated', translate)], on_error='redirect')
+
+        assert list(mapper.mapped['translated']) == ['uno', 'dos']
+        assert list(mapper.mapped.index) == ['a', 'a']
+        assert list(mapper.errors['num']) == [4, 5]
+        assert mapper.idx_errors == ['b', 'b']
+
+    def test_duplicate_labels_inplace(self, df):
+        '''
+        Only the error rows are dropped inplace, even if other rows have the same label
+        '''
+
+        mapper = df.mapping([('num', 'translated', translate)], on_error='redirect', inplace=True)
+
+        assert mapper.mapped is df
+        assert list(df['num']) == [1, 2]
+        assert list(df.index) == ['a', 'a']
+        assert list(mapper.errors['num']) == [4, 5]
+
+    def test_multi_index(self, df):
+        '''
+        Error rows are dropped from dataframes with a MultiIndex
+        '''
+
+        df.index = pd.MultiIndex.from_tuples([('a', 1), ('b', 1), ('a', 2), ('b', 2)])
+        mapper = df.mapping([('num', 'translated', translate)], on_error='redirect', inplace=True)
+
+        assert list(mapper.mapped.index) == [('a', 1), ('a', 2)]
+        assert list(mapper.errors.index) == [('b', 1), ('b', 2)]
+
+    def test_row_with_several_errors(self, df):
+        '''
+        A row with errors in several maps is dropped once, and listed once for each error
+        '''
+
+        mapper = df.mapping(
+            [('num', 'translated', translate), ('num', 'again', translate)],
+            on_error='redirect'
+        )
+
+        assert list(mapper.mapped['again']) == ['uno', 'dos']
+        assert list(mapper.errors['num']) == [4, 4, 5, 5]
+        assert mapper.error_count == 4
+
+
+class TestConditional:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame(
+            {
+                'price': [1.0, -2.0, 3.0, -4.0],
+                'qty': [1, 2, 0, 3],
+                'num_name': ['1-one', '2-two', '3-three', '4-four']
+            }
+        )
+
+    def test_transform_only_matching_rows(self, df):
+        '''
+        The transform is only called for the rows that match the condition
+        '''
+
+        calls = []
+
+        def negate(val):
+            calls.append(val)
+            return -val
+
+        mapper = df.mapping([('price', 'price', negate, {'when': 'price < 0', 'otherwise': None})])
+
+        assert calls == [-2.0, -4.0]
+        assert list(mapper.mapped['price']) == [1.0, 2.0, 3.0, 4.0]
+
+    def test_function_condition_and_constant(self, df):
+        '''
+        The condition can be a vectorized function of the sources, and otherwise a constant
+        '''
+
+        mapper = df.mapping([
+            (['price', 'qty'], 'total', 'price * qty', {'when': lambda sdf: sdf['qty'] > 0, 'otherwise': 0.0})
+        ])
+
+        assert list(mapper.mapped['total']) == [1.0, -4.0, 0.0, -12.0]
+
+    def test_condition_is_aligned(self, df):
+        '''
+        A condition returned in another order is aligned to the rows, and one that is not
+        indexed like the rows makes every row a mapping error
+        '''
+
+        reordered = df.mapping([
+            ('price', 'price', lambda v: -v, {'when': lambda s: (s < 0).iloc[::-1], 'otherwise': None})
+        ])
+        assert list(reordered.mapped['price']) == [1.0, 2.0, 3.0, 4.0]
+
+        misaligned = df.mapping([
+            ('price', 'price', lambda v: -v, {'when': lambda s: (s < 0).set_axis([9, 8, 7, 6]), 'otherwise': None})
+        ], on_error='redirect')
+
+        assert len(misaligned.mapped) == 0
+        assert misaligned.error_summary()['message'].tolist() == ['condition result is not indexed like its input']
+
+    def test_unmatched_rows_are_errors(self, df):
+        '''
+        Without otherwise, rows that do not match the condition are mapping errors
+        '''
+
+        mapper = df.mapping([('qty', 'translated', translate, {'when': 'qty > 0'})], on_error='redirect')
+
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'tres']
+        assert list(mapper.errors['qty']) == [0]
+        assert mapper.error_summary()['message'][0] == "row does not match condition '...'"
+
+    def test_branch_errors(self, df):
+        '''
+        Errors in a branch are attributed to the right rows
+        '''
+
+        mapper = df.mapping(
+            [('qty', 'translated', translate, {'when': 'qty >= 2', 'otherwise': translate})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'tres']
+        assert list(mapper.errors['qty']) == [0]
+
+    def test_multiple_targets(self, df):
+        '''
+        Each branch can provide several targets
+        '''
+
+        mapper = df.mapping([
+            ('num_name', ['split_num', 'split_name'], deconcatenate, {
+                'when': lambda num_name: num_name.str.startswith('2'),
+                'otherwise': lambda row: ('?', '?')
+            })
+        ])
+
+        assert list(mapper.mapped['split_name']) == ['?', 'two', '?', '?']
+        assert list(mapper.mapped['split_num']) == ['?', '2', '?', '?']
+
+    def test_multiple_targets_constant(self, df):
+        '''
+        A constant (or None) otherwise is broadcast to every target, or given per target as a tuple
+        '''
+
+        mapper = df.mapping([
+            ('num_name', ['split_num', 'split_name'], deconcatenate, {
+                'when': lambda num_name: num_name.str.startswith('2'),
+                'otherwise': None
+            }),
+            (['price', 'qty'], ['low', 'high'], lambda row: (row['price'] - 1, row['price'] + 1), {
+                'when': 'qty > 0',
+                'otherwise': (0.0, 10.0)
+            }),
+            (['price', 'qty'], ['total', 'count'], lambda row: (row['price'] * row['qty'], row['qty']), {
+                'when': 'qty > 1',
+                'otherwise': 0
+            })
+        ], on_error='redirect')
+
+        assert mapper.error_count == 0
+        assert list(mapper.mapped['split_num']) == [None, '2', None, None]
+        assert list(mapper.mapped['low']) == [0.0, -3.0, 0.0, -5.0]
+        assert list(mapper.mapped['high']) == [2.0, -1.0, 10.0, -3.0]
+        assert list(mapper.mapped['total']) == [0, -4.0, 0, -12.0]
+        assert list(mapper.mapped['count']) == [0, 2, 0, 3]
+
+    def test_multiple_targets_constant_length(self, df):
+        '''
+        A tuple constant for several targets must have a value for each target
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap(['price', 'qty'], ['low', 'high'], tuple, when='qty > 0', otherwise=(0.0,))
+
+    def test_failing_condition(self, df):
+        '''
+        If the condition fails, all of the rows are mapping errors
+        '''
+
+        mapper = df.mapping(
+            [('num_name', 'upper', str.upper, {'when': lambda num_name: num_name > 2})],
+            on_error='redirect'
+        )
+
+        assert len(mapper.mapped) == 0
+        assert mapper.error_count == 4
+
+
+class TestNaAction:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            'num': [1, None, 3, None],
+            'name': ['one', 'two', None, None]
+        })
+
+    def test_skips_nulls(self, df):
+        '''
+        The transform is never called on null sources, and their targets are missing
+        '''
+
+        calls = []
+        def double(value):
+            calls.append(value)
+            return value * 2
+
+        mapper = df.mapping([('num', 'doubled', double, {'na_action': 'ignore'})])
+
+        assert calls == [1, 3]
+        assert_frame_equal(
+            mapper.mapped,
+            pd.DataFrame({'doubled': [2.0, np.nan, 6.0, np.nan]})
+        )
+
+    def test_default_calls_nulls(self, df):
+        '''
+        Without na_action, the transform is called on null sources
+        '''
+
+        mapper = df.mapping([('name', 'upper', str.upper)], on_error='redirect')
+
+        assert list(mapper.errors.index) == [2, 3]
+
+    def test_mapper_default(self, df):
+        '''
+        The mapper na_action applies to maps that do not set their own
+        '''
+
+        mapper = df.mapping([
+            ('name', 'upper', str.upper),
+            ('num', 'num_str', str, {'na_action': None})
+        ], na_action='ignore')
+
+        assert list(mapper.mapped['upper'][:2]) == ['ONE', 'TWO']
+        assert mapper.mapped['upper'].isna().tolist() == [False, False, True, True]
+        assert list(mapper.mapped['num_str']) == ['1.0', 'nan', '3.0', 'nan']
+
+    def test_any(self, df):
+        '''
+        By default, rows where any source is null are skipped
+        '''
+
+        mapper = df.mapping([
+            (['num', 'name'], 'num_name', concatenate('-'), {'na_action': 'ignore'})
+        ])
+
+        assert mapper.mapped['num_name'][0] == '1.0-one'
+        assert mapper.mapped['num_name'].isna().tolist() == [False, True, True, True]
+
+    def test_all(self, df):
+        '''
+        With na_how='all', only rows where all of the sources are null are skipped
+        '''
+
+        mapper = df.mapping([
+            (['num', 'name'], 'num_name', concatenate('-'), {'na_action': 'ignore', 'na_how': 'all'})
+        ])
+
+        assert list(mapper.mapped['num_name'][:3]) == ['1.0-one', 'nan-two', '3.0-None']
+        assert pd.isna(mapper.mapped['num_name'][3])
+
+    def test_errors_positions(self, df):
+        '''
+        Errors on the non-null rows are attributed to the right rows
+        '''
+
+        mapper = df.mapping(
+            [('num', 'inverse', lambda num: 1 / (num - 3), {'na_action': 'ignore', 'dtype': 'Float64'})],
+            on_error='redirect'
+        )
+
+        assert list(mapper.errors.index) == [2]
+        assert list(mapper.mapped.index) == [0, 1, 3]
+        assert mapper.mapped['inverse'].isna().tolist() == [False, True, True]
+
+    def test_vectorized(self, df):
+        '''
+        Vectorized transforms only receive the non-null rows
+        '''
+
+        mapper = df.mapping([
+            ('name', 'name_len', lambda names: names.str.len() + names.isna() * 100,
+             {'vectorized': True, 'na_action': 'ignore'})
+        ])
+
+        assert mapper.mapped['name_len'].tolist()[:2] == [3, 3]
+        assert mapper.mapped['name_len'].isna().tolist() == [False, False, True, True]
+
+    def test_unknown_options(self):
+        '''
+        Unknown na_action and na_how values are rejected
+        '''
+
+        with pytest.raises(ValueError):
+            pd.PdMap('num', 'num', str, na_action='skip')
+        with pytest.raises(ValueError):
+            pd.PdMap('num', 'num', str, na_how='most')
+
+    def test_dtype_without_missing_values(self, df):
+        '''
+        Dtypes that cannot hold missing values are rejected, since the skipped rows are missing
+        '''
+
+        with pytest.raises(ValueError, match='nullable dtype'):
+            pd.PdMap('num', 'num', int, na_action='ignore', dtype='int64')
+
+        mapper = df.mapping([('num', 'num', int, {'na_action': 'ignore', 'dtype': 'Int64'})], on_error='redirect')
+        assert mapper.error_count == 0
+        assert mapper.mapped['num'].tolist() == [1, pd.NA, 3, pd.NA]
+
+
+class TestCategorical:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            'name': pd.Categorical(['one', 'two', None, 'one', 'two', 'bad'])
+        })
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    @pytest.fixture
+    def upper(self, calls):
+        def _upper(value):
+            calls.append(value)
+            if value == 'bad':
+                raise ValueError('bad name')
+            return value.upper() if isinstance(value, str) else 'MISSING'
+        return _upper
+
+    def test_once_per_category(self, df, calls, upper):
+        '''
+        The transform is called once for each category and once for missing values
+        '''
+
+        mapper = df.mapping([('name', 'upper', upper)], on_error='redirect')
+
+        assert pd.isna(calls[0])
+        assert calls[1:] == ['bad', 'one', 'two']
+        assert_frame_equal(
+            mapper.mapped,
+            pd.DataFrame({'upper': ['ONE', 'TWO', 'MISSING', 'ONE', 'TWO']})
+        )
+
+    def test_unused_categories(self, calls, upper):
+        '''
+        Categories that no row uses are not transformed
+        '''
+
+        df = pd.DataFrame({'name': pd.Categorical(['two', 'one', 'two'], categories=['bad', 'one', 'two', 'zz'])})
+        mapper = df.mapping([('name', 'upper', upper, {'categorical': True})])
+
+        assert calls == ['one', 'two']
+        assert list(mapper.mapped['upper']) == ['TWO', 'ONE', 'TWO']
+        assert list(mapper.mapped['upper'].cat.categories) == ['ONE', 'TWO']
+
+    def test_category_errors(self, df, upper):
+        '''
+        A failing category is an error for every row with that category
+        '''
+
+        df = pd.DataFrame({'name': pd.Categorical(['bad', 'one', 'bad'])})
+        mapper = df.mapping([('name', 'upper', upper)], on_error='redirect')
+
+        assert list(mapper.errors.index) == [0, 2]
+        assert list(mapper.mapped['upper']) == ['ONE']
+
+    def test_categorical_target(self, df, upper):
+        '''
+        With categorical=True, the target is categorical with the distinct results
+        '''
+
+        mapper = df.mapping([('name', 'upper', upper, {'categorical': True})], on_error='redirect')
+
+        assert isinstance(mapper.mapped['upper'].dtype, pd.CategoricalDtype)
+        assert sorted(mapper.mapped['upper'].cat.categories) == ['MISSING', 'ONE', 'TWO']
+        assert list(mapper.mapped['upper']) == ['ONE', 'TWO', 'MISSING', 'ONE', 'TWO']
+
+    def test_unhashable_results(self):
+        '''
+        Results that cannot be categories are decoded instead
+        '''
+
+        df = pd.DataFrame({'name': pd.Categorical(['one', 'two', 'one'])})
+        mapper = df.mapping([('name', 'chars', list, {'categorical': True})])
+
+        assert list(mapper.mapped['chars']) == [['o', 'n', 'e'], ['t', 'w', 'o'], ['o', 'n', 'e']]
+
+    def test_memoize(self, df, calls, upper):
+        '''
+        Memoized transforms of categorical sources are also called once per category
+        '''
+
+        mapper = df.mapping([('name', 'upper', upper, {'memoize': True})], on_error='redirect')
+
+        assert len(calls) == 4
+        assert list(mapper.mapped['upper']) == ['ONE', 'TWO', 'MISSING', 'ONE', 'TWO']
+
+    def test_dtype(self):
+        '''
+        The dtype of the target takes precedence over categorical
+        '''
+
+        df = pd.DataFrame({'num': pd.Categorical(['1', '2', '1'])})
+        mapper = df.mapping([('num', 'num', int, {'categorical': True, 'dtype': 'int64'})])
+
+        assert_frame_equal(mapper.mapped, pd.DataFrame({'num': [1, 2, 1]}))
+
+
+class TestTransformCache:
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            'num': [1, 2, 3, 1, 4],
+            'name': ['one', 'two', 'three', 'one', 'four']
+        })
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    @pytest.fixture
+    def counted_translate(self, calls):
+        def _translate(value):
+            calls.append(value)
+            return translate(value)
+        return _translate
+
+    def test_reuses_results(self, df, tmp_path, calls, counted_translate):
+        '''
+        Results are reused across mappers, and the transform is only called for new values
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'))
+        maps = [('num', 'translated', counted_translate, {'cache': cache, 'cache_key': 'translate'})]
+
+        first = df.head(2).mapping(maps)
+        assert calls == [1, 2]
+
+        second = df.mapping(maps, on_error='redirect')
+        assert calls == [1, 2, 3, 4]
+        assert list(second.mapped['translated']) == ['uno', 'dos', 'tres', 'uno']
+        assert list(first.mapped['translated']) == ['uno', 'dos']
+
+    def test_persists(self, df, tmp_path, calls, counted_translate):
+        '''
+        Results are persisted in the database file
+        '''
+
+        path = str(tmp_path / 'cache.db')
+        for _ in range(2):
+            mapper = df.head(3).mapping([
+                ('num', 'translated', counted_translate, {'cache': TransformCache(path), 'cache_key': 'translate'})
+            ])
+
+        assert calls == [1, 2, 3]
+        assert len(TransformCache(path)) == 3
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'tres']
+
+    def test_errors_not_cached(self, df, tmp_path, calls, counted_translate):
+        '''
+        By default, failures are not cached, so the transform is called again
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'))
+        maps = [('num', 'translated', counted_translate, {'cache': cache, 'cache_key': 'translate'})]
+        df.mapping(maps, on_error='redirect')
+        mapper = df.mapping(maps, on_error='redirect')
+
+        assert calls == [1, 2, 3, 4, 4]
+        assert list(mapper.errors.index) == [4]
+
+    def test_replay_errors(self, df, tmp_path, calls, counted_translate):
+        '''
+        With cache_errors=True, cached failures are replayed as mapping errors
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'), cache_errors=True)
+        maps = [('num', 'translated', counted_translate, {'cache': cache, 'cache_key': 'translate'})]
+        df.mapping(maps, on_error='redirect')
+        mapper = df.mapping(maps, on_error='redirect')
+
+        assert calls == [1, 2, 3, 4]
+        assert list(mapper.errors.index) == [4]
+        assert mapper.errors['__error__'].iloc[0]['msg'].endswith('Unknown translation: 4')
+        assert list(mapper.mapped['translated']) == ['uno', 'dos', 'tres', 'uno']
+
+    def test_lru_eviction(self, df, tmp_path, calls, counted_translate):
+        '''
+        The least recently used results are evicted once the cache is full
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'), max_entries=2)
+        maps = [('num', 'translated', counted_translate, {'cache': cache, 'cache_key': 'translate'})]
+        df.iloc[[0]].mapping(maps)
+        df.iloc[[1]].mapping(maps)
+        df.iloc[[0]].mapping(maps)
+        df.iloc[[2]].mapping(maps)
+        df.iloc[[0, 2]].mapping(maps)
+
+        assert len(cache) == 2
+        assert calls == [1, 2, 3]
+
+    def test_multiple_targets(self, df, tmp_path):
+        '''
+        The results of several targets are cached together
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'))
+        maps = [(['num', 'name'], ['num_str', 'name_len'], lambda row: (str(row['num']), len(row['name'])),
+                 {'cache': cache, 'cache_key': 'num_and_len'})]
+        df.head(2).mapping(maps)
+        mapper = df.mapping(maps)
+
+        assert_frame_equal(
+            mapper.mapped,
+            pd.DataFrame({'num_str': ['1', '2', '3', '1', '4'], 'name_len': [3, 3, 5, 3, 4]})
+        )
+
+    def test_warm_cache_same_result(self, df, tmp_path):
+        '''
+        The mapped values (and their dtypes) do not depend on what was in the cache
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'), cache_errors=True)
+        maps = [
+            (['num', 'name'], ['half', 'name_len'], lambda row: (row['num'] / 2, len(row['name'])),
+             {'cache': cache, 'cache_key': 'half_and_len'}),
+            ('num', 'inverse', lambda num: 12 // (4 - num), {'cache': cache, 'cache_key': 'inverse'})
+        ]
+
+        uncached = df.mapping([amap[:3] for amap in maps], on_error='redirect')
+        cold = df.mapping(maps, on_error='redirect')
+        df.head(2).mapping(maps, on_error='redirect')
+        warm = df.mapping(maps, on_error='redirect')
+
+        assert_frame_equal(cold.mapped, uncached.mapped)
+        assert_frame_equal(warm.mapped, cold.mapped)
+        assert list(warm.errors.index) == list(cold.errors.index) == [4]
+
+    def test_cache_key_needed(self, tmp_path):
+        '''
+        Lambdas cannot be cached without a cache_key
+        '''
+
+        cache = TransformCache(str(tmp_path / 'cache.db'))
+        with pytest.raises(ValueError):
+            pd.PdMap('num', 'num', lambda num: num, cache=cache)